@@ -1,13 +1,28 @@
-
-from .main import launch_matching_config
 from aqt import mw
 from aqt.qt import QAction
 
 __version__ = "1.2.0"
 
+
+# Menu actions only; game modules (UI, card loading, translations) are imported on first use,
+# so Anki startup doesn't pay for a game that may never be opened
+def launch_matching_config():
+    from .main import launch_matching_config as launch
+    launch()
+
+
+def launch_last_game():
+    from .main import launch_last_game as launch
+    launch()
+
+
 def on_load():
     action = QAction("Match Anki Game", mw)
     action.triggered.connect(launch_matching_config)
     mw.form.menuTools.addAction(action)
 
+    replay_action = QAction("Match Anki Game: Replay Last Game", mw)
+    replay_action.triggered.connect(launch_last_game)
+    mw.form.menuTools.addAction(replay_action)
+
 on_load()
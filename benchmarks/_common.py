@@ -0,0 +1,59 @@
+# Shared helpers for the benchmark scripts.
+# Benchmarks run outside of Anki with the `anki` (and `PyQt6`) pip packages installed:
+#   python benchmarks/bench_card_loader.py
+
+import os
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "match_anki_game"
+
+
+def import_addon_module(name: str):
+    # Import add-on submodule without running __init__.py (which needs a running Anki main window)
+    if PACKAGE not in sys.modules:
+        pkg = types.ModuleType(PACKAGE)
+        pkg.__path__ = [ROOT]
+        sys.modules[PACKAGE] = pkg
+    return __import__(f"{PACKAGE}.{name}", fromlist=[name])
+
+
+def synthetic_collection(note_count: int, with_audio: bool = True):
+    # Create temporary collection with `note_count` Basic notes (one card per note)
+    from anki.collection import Collection
+
+    path = os.path.join(tempfile.mkdtemp(prefix="mag_bench_"), "collection.anki2")
+    col = Collection(path)
+
+    model = col.models.by_name("Basic")
+    if with_audio and "Audio" not in col.models.field_names(model):
+        col.models.add_field(model, col.models.new_field("Audio"))
+        col.models.update_dict(model)
+        model = col.models.by_name("Basic")
+
+    deck_id = col.decks.id("Bench")
+    for i in range(note_count):
+        note = col.new_note(model)
+        note["Front"] = f"<b>word {i}</b>"
+        note["Back"] = f"meaning number {i} &nbsp; with some <i>html</i>"
+        if with_audio:
+            note["Audio"] = f"[sound:word_{i}.mp3]"
+        col.add_note(note, deck_id)
+
+    return col, model["id"], deck_id
+
+
+def timed(label: str, fn, repeat: int = 3):
+    # Run fn `repeat` times, print and return best wall time
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best * 1000:10.1f} ms")
+    return best, result
@@ -0,0 +1,53 @@
+# Compare legacy per-card loading (get_card() + note()) with bulk SQL loader
+#   python benchmarks/bench_card_loader.py [note_count]
+
+import sys
+
+from _common import import_addon_module, synthetic_collection, timed
+
+card_loader = import_addon_module("card_loader")
+
+
+def legacy_load(col, card_ids, note_type_id, vocab_field, meaning_field, audio_field):
+    # Copy of the loop previously used in ExamCreatorTab.start_exam
+    all_data = []
+    for cid in card_ids:
+        card = col.get_card(cid)
+        note = card.note()
+        if note.mid != note_type_id:
+            continue
+        vocab_content = note[vocab_field]
+        meaning_content = note[meaning_field]
+        audio_content = note[audio_field] if audio_field else ""
+        if vocab_content and meaning_content:
+            all_data.append((vocab_content, meaning_content, audio_content, cid))
+    return all_data
+
+
+def main():
+    note_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    col, note_type_id, _deck_id = synthetic_collection(note_count)
+    card_ids = col.find_cards('deck:"Bench"')
+    print(f"Synthetic collection: {len(card_ids)} cards")
+
+    fields = ("Front", "Back", "Audio")
+    ords = card_loader.field_indexes(col, note_type_id, *fields)
+
+    def bulk_load():
+        playable = card_loader.playable_card_ids(col, card_ids, note_type_id, ords)
+        return card_loader.load_cards(col, playable, note_type_id, ords)
+
+    legacy_time, legacy_data = timed("legacy get_card()/note() loop",
+                                     lambda: legacy_load(col, card_ids, note_type_id, *fields))
+    timed("card_loader.playable_card_ids",
+          lambda: card_loader.playable_card_ids(col, card_ids, note_type_id, ords))
+    bulk_time, bulk_data = timed("playable_card_ids + load_cards", bulk_load)
+
+    assert sorted(legacy_data, key=lambda t: t[3]) == sorted(bulk_data, key=lambda t: t[3])
+    print(f"Speed-up: {legacy_time / bulk_time:.1f}x")
+
+    col.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Page switch time: new QLabel tile per tile (old load_page) vs reused tiles from TilePool
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_page_switch.py [pairs_per_page] [pages]
+
+import sys
+
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import QApplication, QGridLayout, QLabel, QPushButton, QSizePolicy, QWidget
+
+from _common import import_addon_module, timed
+
+tile_pool = import_addon_module("ui.tile_pool")
+
+COLUMNS = 10
+
+LEGACY_TILE_STYLE = """
+    QPushButton {
+        border: 2px solid gray;
+        border-radius: 5px;
+        color: white;
+        background-color: transparent;
+        white-space: normal;
+        min-height: 40px;
+        padding: 5px;
+        text-align: center;
+    }
+    QPushButton:hover {
+        border-color: yellow;
+        background-color: rgba(100, 100, 100, 50);
+    }
+    QPushButton:pressed {
+        background-color: rgba(50, 50, 50, 255);
+        border-style: inset;
+    }
+    QPushButton:checked {
+        background-color: #55aaff;
+    }
+"""
+
+
+class LegacyTile(QPushButton):
+    # Copy of the construction of AnimatedButton before TilePool (QLabel child, stylesheet per button);
+    # animations are not part of a page switch and are left out
+    def __init__(self, text, font_size=18):
+        super().__init__("")
+        self.label = QLabel(text, self)
+        self.label.setWordWrap(True)
+        self.label.setStyleSheet("QLabel { background-color: transparent; color: white; }")
+        self.label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        font = QFont()
+        font.setPointSize(font_size)
+        self.label.setFont(font)
+
+        self.setFlat(True)
+        self.setStyleSheet(LEGACY_TILE_STYLE)
+        self.setCheckable(True)
+        self.setAutoFillBackground(True)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.label.setGeometry(self.rect().adjusted(5, 5, -5, -5))
+
+
+def page_texts(page: int, pairs: int) -> list[str]:
+    return [f"word {page}-{i}" for i in range(pairs)] + [f"meaning {page}-{i}" for i in range(pairs)]
+
+
+def place(grid: QGridLayout, buttons) -> None:
+    for pos, btn in enumerate(buttons):
+        grid.addWidget(btn, pos // COLUMNS, pos % COLUMNS)
+        btn.show()
+
+
+def run_legacy(app, window, grid, pairs, pages):
+    for page in range(pages):
+        # clear_grid() + new tile for every text
+        while grid.count():
+            child = grid.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+        place(grid, [LegacyTile(text) for text in page_texts(page, pairs)])
+        grid.activate()
+        app.processEvents()
+
+
+def run_pool(app, window, grid, pairs, pages):
+    pool = tile_pool.TilePool(window)
+    for page in range(pages):
+        pool.release_grid(grid)
+        place(grid, [pool.acquire(text) for text in page_texts(page, pairs)])
+        grid.activate()
+        app.processEvents()
+
+
+def main():
+    pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = QApplication(sys.argv)
+
+    print(f"{pages} page switches, {pairs * 2} tiles per page")
+    results = {}
+    for label, runner in (("new buttons per page", run_legacy), ("TilePool", run_pool)):
+        window = QWidget()
+        grid = QGridLayout(window)
+        window.resize(1600, 900)
+        window.show()
+        best, _ = timed(label, lambda: runner(app, window, grid, pairs, pages))
+        results[label] = best
+        window.close()
+
+    print(f"Per page: {results['new buttons per page'] / pages * 1000:.1f} ms -> "
+          f"{results['TilePool'] / pages * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Aggregation time of session analytics over synthetic session logs
+#   python benchmarks/bench_session_analytics.py [events] [sessions]
+
+import random
+import sys
+import tempfile
+
+from _common import import_addon_module, timed
+
+enums = import_addon_module("enums")
+session_recorder = import_addon_module("session_recorder")
+session_analytics = import_addon_module("session_analytics")
+
+SessionEvent = enums.SessionEvent
+
+
+def write_synthetic_sessions(directory: str, events: int, sessions: int, cards: int = 20000) -> None:
+    per_session = events // sessions
+    for s in range(sessions):
+        recorder = session_recorder.SessionRecorder(directory)
+        recorder.path = recorder.path.replace(".mags", f"_{s}.mags")
+        recorder.started_at_ms -= (sessions - s) * 24 * 3600 * 1000     # one session per day
+        written = 1
+        while written < per_session:
+            if written % 40 == 1:
+                recorder.record(SessionEvent.PAGE_LOADED, written // 40, 15000)
+            card = random.randrange(cards)
+            recorder.record(SessionEvent.SELECT_VOCAB, card)
+            if random.random() < 0.2:
+                recorder.record(SessionEvent.MISTAKE, card, 0)
+                recorder.record(SessionEvent.MISTAKE, random.randrange(cards), 1)
+                written += 3
+            else:
+                recorder.record(SessionEvent.MATCH, card)
+                written += 2
+        recorder.close()
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    directory = tempfile.mkdtemp(prefix="mag_sessions_")
+    write_synthetic_sessions(directory, events, sessions)
+
+    print(f"NumPy: {'yes' if session_analytics.np is not None else 'no (pure Python aggregation)'}")
+    _, history = timed("load_history", lambda: session_analytics.load_history(directory))
+    print(f"{len(history.events)} events in {len(history.session_lengths)} sessions")
+    _, result = timed("analyze", lambda: session_analytics.analyze(history))
+    print(f"cards: {len(result.cards)}, matches: {result.matches}, mistakes: {result.mistakes}")
+
+
+if __name__ == "__main__":
+    main()
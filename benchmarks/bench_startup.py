@@ -0,0 +1,68 @@
+# Add-on startup cost: what Anki pays at profile load to register the Tools menu actions.
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_startup.py [runs]
+#
+# Every measurement runs in a fresh interpreter (module cache is what is being measured).
+# aqt / PyQt6 are imported before the clock starts, they are loaded by Anki anyway.
+#   baseline: everything the add-on imported at startup before lazy loading (main -> config window,
+#             game window, tiles, timers, grading, translations)
+#   add-on:   package __init__ as it is now
+
+import os
+import subprocess
+import sys
+
+from _common import ROOT, PACKAGE
+
+CHILD = r"""
+import importlib.util, sys, time, types
+from PyQt6.QtWidgets import QApplication, QMainWindow, QMenu
+import aqt
+
+app = QApplication([])
+main_window = QMainWindow()
+main_window.form = types.SimpleNamespace(menuTools=QMenu(main_window))
+aqt.mw = main_window
+aqt.mw.pm = types.SimpleNamespace(meta={})
+
+root, package, mode = sys.argv[1], sys.argv[2], sys.argv[3]
+start = time.perf_counter()
+if mode == "baseline":
+    pkg = types.ModuleType(package)
+    pkg.__path__ = [root]
+    sys.modules[package] = pkg
+    main = __import__(f"{package}.main", fromlist=["main"])
+    main.tr("window_title_config")
+else:
+    spec = importlib.util.spec_from_file_location(package, f"{root}/__init__.py", submodule_search_locations=[root])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[package] = module
+    spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+print(elapsed, len([name for name in sys.modules if name.startswith(package)]))
+"""
+
+
+def measure(mode: str, runs: int) -> tuple[float, int]:
+    best, modules = None, 0
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", CHILD, ROOT, PACKAGE, mode],
+                                capture_output=True, text=True, check=True,
+                                env={**os.environ, "QT_QPA_PLATFORM": os.environ.get("QT_QPA_PLATFORM", "offscreen")})
+        elapsed, modules = result.stdout.split()
+        best = float(elapsed) if best is None else min(best, float(elapsed))
+    return best, int(modules)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    baseline_time, baseline_modules = measure("baseline", runs)
+    addon_time, addon_modules = measure("addon", runs)
+
+    print(f"{'eager import of main (baseline)':<40} {baseline_time * 1000:10.1f} ms  {baseline_modules:3} add-on modules")
+    print(f"{'package __init__ (lazy)':<40} {addon_time * 1000:10.1f} ms  {addon_modules:3} add-on modules")
+    print(f"speedup: {baseline_time / addon_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+class CancellationToken:
+    # Shared flag between UI thread and background operation.
+    # UI calls cancel(), background work checks is_cancelled between steps and stops early.
+
+    def __init__(self):
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
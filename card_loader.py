@@ -0,0 +1,125 @@
+from typing import Callable, Iterator, Sequence
+
+from anki.collection import Collection
+from anki.utils import split_fields
+
+from .field_text import field_text_cache
+
+# Number of card ids bound into a single SQL query.
+# SQLite older builds limit host parameters to 999 per statement, keep a margin for extra params.
+CHUNK_SIZE = 900
+
+
+def chunked(ids: Sequence[int], size: int = CHUNK_SIZE) -> Iterator[Sequence[int]]:
+    # Split long id lists into slices small enough for one query
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def field_indexes(col: Collection, note_type_id: int, vocab_field: str, meaning_field: str,
+                  audio_field: str = "") -> tuple[int, int, int | None]:
+    # Translate selected field names into positions inside the note's field blob
+    model = col.models.get(note_type_id)
+    if not model:
+        raise KeyError(f"Note type {note_type_id} not found")
+
+    field_map = col.models.field_map(model)     # name -> (ord, field dict)
+    vocab_ord = field_map[vocab_field][0]
+    meaning_ord = field_map[meaning_field][0]
+    audio_ord = field_map[audio_field][0] if audio_field else None
+
+    return vocab_ord, meaning_ord, audio_ord
+
+
+def query_card_rows(col: Collection, card_ids: Sequence[int], note_type_id: int) -> list[tuple[int, int, int, str, int]]:
+    # (card id, note id, mid, field blob, note mtime) for one chunk of card ids, only cards of the selected note type
+    placeholders = ",".join("?" * len(card_ids))
+    return col.db.execute(
+        f"select c.id, c.nid, n.mid, n.flds, n.mod from cards c "
+        f"join notes n on n.id = c.nid "
+        f"where c.id in ({placeholders}) and n.mid = ?",
+        *card_ids, note_type_id,
+    )
+
+
+def iter_card_rows(col: Collection, card_ids: Sequence[int], note_type_id: int) -> Iterator[tuple[int, int, int, str, int]]:
+    # One query per chunk instead of get_card() + note() per card
+    for chunk in chunked(card_ids):
+        yield from query_card_rows(col, chunk, note_type_id)
+
+
+def extract_fields(flds: str, ords: tuple[int, int, int | None]) -> tuple[str, str, str] | None:
+    # (vocab, meaning, audio) from the note's field blob, None when Vocab or Meaning is empty
+    vocab_ord, meaning_ord, audio_ord = ords
+    fields = split_fields(flds)
+
+    vocab_content = fields[vocab_ord]
+    meaning_content = fields[meaning_ord]
+    audio_content = fields[audio_ord] if audio_ord is not None else ""
+
+    # Check if both required fields have content
+    if vocab_content and meaning_content:
+        return vocab_content, meaning_content, audio_content
+    return None
+
+
+def playable_card_ids(col: Collection, card_ids: Sequence[int], note_type_id: int,
+                      ords: tuple[int, int, int | None],
+                      on_chunk: Callable[[int], None] | None = None,
+                      texts: dict[int, tuple[str, str]] | None = None) -> list[int]:
+    # Ids of cards of the selected note type with content in both Vocab and Meaning fields.
+    # Field text is checked chunk by chunk and dropped, only ids are kept
+    # (unless `texts` dict is given: it gets card id -> (vocab, meaning) of every playable card).
+    # on_chunk is called with number of card ids processed after every chunk (progress / cancellation).
+    playable = []
+    for chunk in chunked(card_ids):
+        for cid, _nid, _mid, flds, _mod in query_card_rows(col, chunk, note_type_id):
+            fields = extract_fields(flds, ords)
+            if fields:
+                playable.append(cid)
+                if texts is not None:
+                    texts[cid] = fields[:2]
+
+        if on_chunk:
+            on_chunk(len(chunk))
+
+    return playable
+
+
+def load_cards(col: Collection, card_ids: Sequence[int], note_type_id: int,
+               ords: tuple[int, int, int | None]) -> list[tuple[str, str, str, int]]:
+    # Build (vocab, meaning, audio, card_id) tuples for MatchingExam, in order of card_ids.
+    # Vocab and meaning are normalized for tiles (field_text), audio keeps raw [sound:] tags.
+    # Cards deleted or emptied in the meantime are skipped.
+    vocab_ord, meaning_ord, _audio_ord = ords
+    by_id = {}
+    for chunk in chunked(card_ids):
+        rows = []
+        raw_fields = []
+        for cid, nid, _mid, flds, mod in query_card_rows(col, chunk, note_type_id):
+            fields = extract_fields(flds, ords)
+            if fields:
+                vocab, meaning, audio = fields
+                rows.append((cid, audio))
+                raw_fields.append((nid, mod, vocab_ord, vocab))
+                raw_fields.append((nid, mod, meaning_ord, meaning))
+
+        # Whole chunk is normalized (or read from sidecar) at once
+        texts = field_text_cache.normalized_many(raw_fields)
+        for index, (cid, audio) in enumerate(rows):
+            by_id[cid] = (texts[2 * index], texts[2 * index + 1], audio, cid)
+
+    return [by_id[cid] for cid in card_ids if cid in by_id]
+
+
+def sort_field_texts(col: Collection, card_ids: Sequence[int]) -> dict[int, str]:
+    # card id -> note's sort field, short label of a card for statistics views
+    texts = {}
+    for chunk in chunked(card_ids):
+        placeholders = ",".join("?" * len(chunk))
+        for cid, sfld in col.db.execute(
+            f"select c.id, n.sfld from cards c join notes n on n.id = c.nid where c.id in ({placeholders})",
+            *chunk,
+        ):
+            texts[cid] = str(sfld)
+    return texts
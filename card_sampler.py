@@ -0,0 +1,53 @@
+import random
+from typing import Sequence
+
+from anki.collection import Collection
+
+from .card_loader import chunked
+from .session_analytics import analyze, load_history
+
+# Weight of every difficulty signal, added to base weight 1.0
+GAME_ERROR_WEIGHT = 4.0     # in-game error rate (0..1)
+LAPSES_WEIGHT = 0.5         # per lapse, capped by MAX_LAPSES
+EASE_WEIGHT = 2.0           # per 1000 permille of ease below default 250%
+MAX_LAPSES = 8
+DEFAULT_EASE = 2500
+
+
+def game_error_rates() -> dict[int, float]:
+    # card id -> error rate from recorded game sessions
+    return {card.card_id: card.error_rate for card in analyze(load_history()).cards}
+
+
+def card_weights(col: Collection, card_ids: Sequence[int], error_rates: dict[int, float]) -> list[float]:
+    # Higher weight = card needs more work: often missed in game, many lapses, low ease
+    ease_lapses = {}
+    for chunk in chunked(card_ids):
+        placeholders = ",".join("?" * len(chunk))
+        for cid, factor, lapses in col.db.execute(
+            f"select id, factor, lapses from cards where id in ({placeholders})", *chunk
+        ):
+            ease_lapses[cid] = (factor, lapses)
+
+    weights = []
+    for cid in card_ids:
+        factor, lapses = ease_lapses.get(cid, (0, 0))
+        weight = 1.0 + GAME_ERROR_WEIGHT * error_rates.get(cid, 0.0)
+        weight += LAPSES_WEIGHT * min(lapses, MAX_LAPSES)
+        # New cards have factor 0, they are neutral
+        if factor:
+            weight += EASE_WEIGHT * max(0, DEFAULT_EASE - factor) / 1000
+        weights.append(weight)
+    return weights
+
+
+def weighted_order(card_ids: Sequence[int], weights: Sequence[float]) -> list[int]:
+    # Weighted random permutation (Efraimidis-Spirakis): every card gets key Exp(weight),
+    # sorting by key puts heavy cards in front with probability proportional to weight. O(n log n).
+    keys = [random.expovariate(weight) for weight in weights]
+    order = sorted(range(len(card_ids)), key=keys.__getitem__)
+    return [card_ids[i] for i in order]
+
+
+def difficulty_weighted_shuffle(col: Collection, card_ids: Sequence[int]) -> list[int]:
+    return weighted_order(card_ids, card_weights(col, card_ids, game_error_rates()))
@@ -0,0 +1,97 @@
+import time
+from typing import Protocol
+
+from aqt.qt import QObject, QTimer, Qt
+
+
+class Clock(Protocol):
+    # What ClockService drives: refresh() on every tick, ms_to_next_second() to arm the timer
+    def refresh(self, now: float) -> None: ...
+
+    def ms_to_next_second(self, now: float) -> int: ...
+
+
+class ClockService(QObject):
+    # One timer for all displayed clocks (TimerManager, ClockdownManager).
+    # Clocks compute time from time.monotonic() timestamps, so late timer ticks
+    # (busy event loop) never make them drift. Timer is re-armed for the nearest
+    # full-second boundary of registered clocks, labels change exactly on seconds.
+
+    def __init__(self):
+        super().__init__()
+        self.clocks: list[Clock] = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+
+    def register(self, clock: Clock) -> None:
+        if clock not in self.clocks:
+            self.clocks.append(clock)
+        self._schedule()
+
+    def unregister(self, clock: Clock) -> None:
+        if clock in self.clocks:
+            self.clocks.remove(clock)
+        if not self.clocks:
+            self.timer.stop()
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        for clock in list(self.clocks):
+            clock.refresh(now)
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if not self.clocks:
+            return
+        now = time.monotonic()
+        delay = min(clock.ms_to_next_second(now) for clock in self.clocks)
+        # +1 ms to land just after the boundary, not just before it
+        self.timer.start(max(1, delay + 1))
+
+
+class MonotonicClock:
+    # Base for clocks driven by ClockService: time is always now - start timestamp.
+    # Subclass completes Clock protocol with refresh(now). It's checked when subclass is defined
+    # (not with ABCMeta, which conflicts with QObject metaclass of TimerManager / ClockdownManager).
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, "refresh", None)):
+            raise TypeError(f"{cls.__name__} must define refresh(now) to be driven by ClockService")
+
+    def __init__(self):
+        self.started_at: float | None = None
+
+    def elapsed(self, now: float | None = None) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (now if now is not None else time.monotonic()) - self.started_at
+
+    def elapsed_seconds(self, now: float | None = None) -> int:
+        return int(self.elapsed(now))
+
+    def ms_to_next_second(self, now: float) -> int:
+        elapsed_ms = int(self.elapsed(now) * 1000)
+        return 1000 - elapsed_ms % 1000
+
+    def start_clock(self) -> None:
+        self.started_at = time.monotonic()
+        clock_service().register(self)
+
+    def stop_clock(self) -> None:
+        clock_service().unregister(self)
+        self.started_at = None
+
+
+_clock_service: ClockService | None = None
+
+
+def clock_service() -> ClockService:
+    # Shared by all game windows, created on first use (needs running QApplication)
+    global _clock_service
+    if _clock_service is None:
+        _clock_service = ClockService()
+    return _clock_service
@@ -1,27 +1,25 @@
-from aqt.qt import QTimer, QTime, QLabel, QObject, pyqtSignal
+from aqt.qt import QTime, QLabel, QObject, pyqtSignal
 
+from .clock_service import MonotonicClock
 
-class ClockdownManager(QObject):
+
+class ClockdownManager(QObject, MonotonicClock):
     # Define a custom signal that is emitted when the timer reaches 0
     timeout_finished = pyqtSignal()
 
     def __init__(self, clockdown_time: QTime, clockdown_label: QLabel):
-        super().__init__()
+        QObject.__init__(self)
+        MonotonicClock.__init__(self)
 
         # State variables
+        self.secs_total: int = 0
         self.secs_remaining: int = 0
         self.is_running: bool = False
 
         # UI references
-        #self.time_edit = time_edit
         self.clockdown_time = clockdown_time
         self.clockdown_label = clockdown_label
 
-        # QTimer setup
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._update_cycle)
-        self.timer.setInterval(1000)  # 1000 ms = 1 second interval
-
         self.clockdown_label.setText("00:00")
 
     def start_clockdown(self) -> None:
@@ -29,29 +27,34 @@ class ClockdownManager(QObject):
         if self.is_running:
             self.stop_clockdown()
 
-        time_obj: QTime = self.clockdown_time  # self.time_edit.time()
+        time_obj: QTime = self.clockdown_time
 
         # Convert QTime (MM:SS) to total seconds (int)
-        self.secs_remaining = time_obj.minute() * 60 + time_obj.second()
+        self.secs_total = time_obj.minute() * 60 + time_obj.second()
+        self.secs_remaining = self.secs_total
 
         if self.secs_remaining <= 0:
             return
 
-        # Start the QTimer and update UI immediately
+        # Start the clock and update UI immediately
         self.is_running = True
-        self.timer.start()
+        self.start_clock()
         self._update_label()
 
-    def _update_cycle(self) -> None:
-        # Called every second by QTimer
-
+    def refresh(self, now: float) -> None:
+        # Called by ClockService on second boundaries.
+        # Remaining time comes from start timestamp, late ticks don't accumulate.
         if not self.is_running:
             return
 
-        self.secs_remaining -= 1
+        remaining = self.secs_total - self.elapsed_seconds(now)
+        if remaining == self.secs_remaining:
+            return
+        self.secs_remaining = remaining
 
         if self.secs_remaining <= 0:
             self.stop_clockdown()
+            self.secs_remaining = 0
             self.clockdown_label.setText("00:00")
 
             # Emit the custom signal to notify external listeners
@@ -69,7 +72,6 @@ class ClockdownManager(QObject):
         self.clockdown_label.setText(f"{minutes:02d}:{seconds:02d}")
 
     def stop_clockdown(self) -> None:
-        # Stops the QTimer and resets the state flag
-        if self.timer.isActive():
-            self.timer.stop()
+        # Stops the clock and resets the state flag
+        self.stop_clock()
         self.is_running = False
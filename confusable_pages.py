@@ -0,0 +1,146 @@
+import re
+import zlib
+from collections import Counter, deque
+from typing import Sequence
+
+# Text similarity index (MinHash over character n-grams + LSH banding).
+# Built once per game from the prepared cards; finds similar vocab / meanings
+# without comparing every pair of cards.
+
+NGRAM_SIZE = 3
+
+# Signature = BANDS * ROWS_PER_BAND min-hashes. Two texts share a bucket when all rows of any band match;
+# with 8 x 2 texts with ~40% n-gram overlap already meet with probability ~75%.
+BANDS = 8
+ROWS_PER_BAND = 2
+SIGNATURE_SIZE = BANDS * ROWS_PER_BAND
+
+# Buckets bigger than this (very short or very common texts) are not used as candidates
+MAX_BUCKET_SIZE = 100
+
+# Unused cards checked for a page seed without duplicate text, before the next card is taken anyway
+SEED_SCAN_LIMIT = 64
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_HASH_PARAMS = [
+    (1 + zlib.crc32(f"a{i}".encode()) * 2654435761 % _MERSENNE_PRIME,
+     zlib.crc32(f"b{i}".encode()) * 40503 % _MERSENNE_PRIME)
+    for i in range(SIGNATURE_SIZE)
+]
+
+_TAG_REGEX = re.compile(r"<[^>]*>|\[sound:[^]]*]|&[a-zA-Z#0-9]+;")
+_SPACE_REGEX = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACE_REGEX.sub(" ", _TAG_REGEX.sub(" ", text)).strip().lower()
+
+
+def _ngrams(text: str) -> set[str]:
+    # Padded, so texts sharing a prefix / suffix share n-grams as well
+    padded = f" {text} "
+    if len(padded) <= NGRAM_SIZE:
+        return {padded}
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class SimilarityIndex:
+    def __init__(self, texts: Sequence[tuple[str, str]]):
+        # texts: (vocab, meaning) per card, cards are referred to by position
+        self.size = len(texts)
+        self.signatures: list[tuple[tuple[int, ...], tuple[int, ...]]] = []
+
+        # (side, band, band values) -> positions
+        self.buckets: dict[tuple, list[int]] = {}
+
+        # Hashes of one n-gram are computed once for the whole deck, a card signature is
+        # then element-wise minimum over its n-grams
+        gram_hashes: dict[str, tuple[int, ...]] = {}
+
+        for position, card_texts in enumerate(texts):
+            card_signatures = []
+            for side, text in enumerate(card_texts):
+                hashes = []
+                for gram in _ngrams(_normalize(text)):
+                    gram_hash = gram_hashes.get(gram)
+                    if gram_hash is None:
+                        base = zlib.crc32(gram.encode())
+                        gram_hash = tuple((a * base + b) % _MERSENNE_PRIME for a, b in _HASH_PARAMS)
+                        gram_hashes[gram] = gram_hash
+                    hashes.append(gram_hash)
+                signature = tuple(map(min, zip(*hashes)))
+                card_signatures.append(signature)
+
+                for band in range(BANDS):
+                    key = (side, band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+                    self.buckets.setdefault(key, []).append(position)
+
+            self.signatures.append(tuple(card_signatures))
+
+    def candidates(self, position: int, limit: int) -> list[int]:
+        # Up to `limit` cards sharing LSH buckets with the card, ones sharing most buckets
+        # (highest estimated n-gram overlap of vocab or meaning) first
+        shared = Counter()
+        for side, signature in enumerate(self.signatures[position]):
+            for band in range(BANDS):
+                bucket = self.buckets[(side, band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])]
+                if len(bucket) <= MAX_BUCKET_SIZE:
+                    shared.update(bucket)
+        del shared[position]
+        return [other for other, _count in shared.most_common(limit)]
+
+
+def confusable_order(card_ids: Sequence[int], texts: Sequence[tuple[str, str]], page_size: int) -> list[int]:
+    # Reorder cards page by page so similar cards land on the same page.
+    # Every page starts with the first unused card in the current order (shuffle / difficulty order is kept
+    # as priority) and is filled with its similar cards, then with cards similar to those.
+    # When no similar card is left, the next unused card seeds the rest of the page.
+    # Similar, not identical: cards with the same vocab or meaning text go to different pages
+    # (two equal tiles teach nothing). Only when no other card is left, a duplicate fills the page.
+    index = SimilarityIndex(texts)
+    duplicate_keys = [(_normalize(vocab), _normalize(meaning)) for vocab, meaning in texts]
+    used = bytearray(len(card_ids))
+    order = []
+    next_seed = 0
+
+    while len(order) < len(card_ids):
+        page = []
+        page_vocab, page_meaning = set(), set()
+
+        def duplicates_page(position: int) -> bool:
+            vocab, meaning = duplicate_keys[position]
+            return vocab in page_vocab or meaning in page_meaning
+
+        queue = deque()
+        expanded = 0    # candidates are looked up only for as many page members as needed to fill it
+        while len(page) < page_size and len(order) + len(page) < len(card_ids):
+            if queue:
+                position = queue.popleft()
+                if used[position] or duplicates_page(position):
+                    continue
+            elif expanded < len(page):
+                queue.extend(other for other in index.candidates(page[expanded], page_size * 2)
+                             if not used[other])
+                expanded += 1
+                continue
+            else:
+                while used[next_seed]:
+                    next_seed += 1
+                position = next_seed
+                candidate, scanned = next_seed, 0
+                while candidate < len(card_ids) and scanned < SEED_SCAN_LIMIT:
+                    if not used[candidate]:
+                        if not duplicates_page(candidate):
+                            position = candidate
+                            break
+                        scanned += 1
+                    candidate += 1
+
+            used[position] = 1
+            page.append(position)
+            page_vocab.add(duplicate_keys[position][0])
+            page_meaning.add(duplicate_keys[position][1])
+
+        order.extend(page)
+
+    return [card_ids[position] for position in order]
@@ -0,0 +1,87 @@
+from anki.collection import Collection, OpChanges
+from aqt import gui_hooks
+
+from .scheduled_pool import deck_filter_sql, deck_ids_with_children
+
+
+def note_types_for_deck(col: Collection, deck_id: int) -> list[tuple[int, str]]:
+    # Returns (note type id, name) for note types used by cards in the deck and its subdecks.
+    # Single JOIN grouped by mid, only deck ids are bound, so size of the deck doesn't matter.
+    deck_sql, deck_args = deck_filter_sql(deck_ids_with_children(col, deck_id))
+    mids = col.db.list(
+        f"select n.mid from cards c join notes n on n.id = c.nid where {deck_sql} group by n.mid",
+        *deck_args,
+    )
+
+    note_types = []
+    for mid in mids:
+        nt = col.models.get(mid)
+        if nt:
+            note_types.append((mid, nt["name"]))
+    return note_types
+
+
+def field_names_for_note_type(col: Collection, note_type_id: int) -> list[str]:
+    model = col.models.get(note_type_id)
+    if not model:
+        return []
+    return [f["name"] for f in model["flds"]]
+
+
+class DeckMetadataCache:
+    # In-memory cache for config window: deck list, deck id -> note types, note type id -> fields.
+    # Cleared by Anki operation hooks, so data shown in config is never stale.
+
+    def __init__(self):
+        self.decks: list[tuple[str, int]] | None = None
+        self.note_types: dict[int, list[tuple[int, str]]] = {}
+        self.fields: dict[int, list[str]] = {}
+
+        # Incremented on every invalidation. Background queries started before
+        # invalidation compare it and don't store their (maybe outdated) results.
+        self.generation = 0
+
+        gui_hooks.operation_did_execute.append(self._on_operation_did_execute)
+        gui_hooks.collection_did_load.append(lambda _col: self.clear())
+        gui_hooks.sync_did_finish.append(self.clear)
+
+    def clear(self) -> None:
+        self.decks = None
+        self.note_types.clear()
+        self.fields.clear()
+        self.generation += 1
+
+    def _on_operation_did_execute(self, changes: OpChanges, handler: object | None) -> None:
+        if changes.notetype:
+            # Names, fields and usage of note types could change
+            self.note_types.clear()
+            self.fields.clear()
+            self.generation += 1
+        if changes.deck:
+            # Deck added/renamed/removed, subdeck hierarchy may differ
+            self.decks = None
+            self.note_types.clear()
+            self.generation += 1
+        elif changes.card or changes.note_text:
+            # Cards added, deleted or moved between decks
+            self.note_types.clear()
+            self.generation += 1
+
+    def get_decks(self, col: Collection) -> list[tuple[str, int]]:
+        if self.decks is None:
+            self.decks = [(deck.name, deck.id) for deck in col.decks.all_names_and_ids()]
+        return self.decks
+
+    def get_fields(self, col: Collection, note_type_id: int) -> list[str]:
+        if note_type_id not in self.fields:
+            self.fields[note_type_id] = field_names_for_note_type(col, note_type_id)
+        return self.fields[note_type_id]
+
+    def store_note_types(self, generation: int, deck_id: int, note_types: list[tuple[int, str]]) -> None:
+        # Result computed before last invalidation is not cached
+        if generation == self.generation:
+            self.note_types[deck_id] = note_types
+
+
+# One cache shared by all config windows
+metadata_cache = DeckMetadataCache()
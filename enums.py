@@ -1,7 +1,20 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 
 class TimekeepingMode(Enum):
     TIME_INFORMATIONAL = 0
     COUNTDOWN_PER_PAGE = 1
     COUNTDOWN_FOR_ALL_CARDS = 2
+
+
+class SessionEvent(IntEnum):
+    # Event codes stored in session logs (SessionRecorder), values must never change
+    SESSION_START = 0
+    SESSION_END = 1
+    PAGE_LOADED = 2         # card_id: page index, value: page build time in µs
+    SELECT_VOCAB = 3        # card_id: selected card
+    SELECT_MEANING = 4      # card_id: selected card
+    MATCH = 5               # card_id: matched card
+    MISTAKE = 6             # card_id: card involved in wrong pair, value: 0 vocab / 1 meaning tile
+    AUDIO_STARTED = 7       # card_id: card whose audio is played
+    AUDIO_FINISHED = 8
@@ -0,0 +1,181 @@
+import html
+import os
+import re
+from collections import OrderedDict
+from typing import Sequence
+from urllib.parse import unquote
+
+from .snapshot_cache import FieldTextStore
+
+# Normalization of note field content before it's shown on tiles.
+# Done once per card when page data is loaded; tiles get either plain text (painted directly),
+# sanitized RichText (laid out by QTextDocument) or ImageField (picture from media folder + caption).
+
+# Normalized fields kept between pages and games, (note id, note mtime, field ord) -> text
+FIELD_CACHE_ENTRIES = 20000
+# Stored normalized fields of other versions are normalized again; raise when normalize_field changes
+NORMALIZER_VERSION = 1
+
+# Kind of normalized field in FieldTextStore
+KIND_PLAIN, KIND_RICH, KIND_IMAGE = 0, 1, 2
+
+SOUND_TAG_REGEX = re.compile(r"\[sound:[^\]]*\]")
+COMMENT_REGEX = re.compile(r"<!--.*?-->", re.S)
+# Elements removed together with their content
+DROPPED_ELEMENT_REGEX = re.compile(r"<(script|style|head|title|object|iframe)\b[^>]*>.*?</\1\s*>", re.I | re.S)
+TAG_REGEX = re.compile(r"<\s*(/?)\s*([a-zA-Z][a-zA-Z0-9]*)([^>]*)>")
+IMAGE_SOURCE_REGEX = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*("[^"]*"|'[^']*'|[^\s>]+)""", re.I)
+STYLE_ATTRIBUTE_REGEX = re.compile(r"""\b(style|color)\s*=\s*("[^"]*"|'[^']*')""", re.I)
+SPACES_REGEX = re.compile(r"[ \t\r\f\v\xa0]+")
+LINES_REGEX = re.compile(r"\s*\n\s*")
+
+# Inline formatting rendered by tiles, any other tag is removed (its text stays)
+RICH_TAGS = frozenset({"b", "strong", "i", "em", "u", "s", "sub", "sup", "span", "font", "small", "big",
+                       "ruby", "rt", "rp"})
+# Tags breaking the line
+LINE_BREAK_TAGS = frozenset({"br", "div", "p", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"})
+
+
+class RichText(str):
+    # Field content with formatting that must be kept, tiles render it as HTML
+    pass
+
+
+class ImageField(str):
+    # Field showing a picture; the string itself is the media file name, text around the image is `caption`
+    caption: str
+
+    def __new__(cls, filename: str, caption: str = ""):
+        field = super().__new__(cls, filename)
+        field.caption = caption
+        return field
+
+
+def _sanitize_tag(match: re.Match) -> str:
+    closing, name, attributes = match.groups()
+    name = name.lower()
+    if name in LINE_BREAK_TAGS:
+        return "<br>"
+    if name not in RICH_TAGS:
+        return ""
+    if closing:
+        return f"</{name}>"
+    # Only styling attributes survive (no event handlers, links or external resources)
+    kept = " ".join(
+        f"{key.lower()}={value}" for key, value in STYLE_ATTRIBUTE_REGEX.findall(attributes)
+        if "url(" not in value.lower()
+    )
+    return f"<{name} {kept}>" if kept else f"<{name}>"
+
+
+def _caption_tag(match: re.Match) -> str:
+    # Caption of an image is plain text, only line breaks are kept
+    return "<br>" if match.group(2).lower() in LINE_BREAK_TAGS else ""
+
+
+def _media_filename(source: str) -> str:
+    # File name in collection media folder, "" for remote / inline images
+    source = html.unescape(source.strip("\"'"))
+    if "://" in source or source.startswith("data:"):
+        return ""
+    # Media folder is flat, never leave it
+    return os.path.basename(unquote(source))
+
+
+def _plain(text: str) -> str:
+    text = html.unescape(text.replace("<br>", "\n"))
+    text = SPACES_REGEX.sub(" ", text)
+    return LINES_REGEX.sub("\n", text).strip()
+
+
+def normalize_field(content: str) -> str:
+    # Strip [sound:] tags and unsafe / layout HTML; RichText when formatting is left, plain str otherwise
+    # Raw new lines are plain whitespace in HTML, line breaks come only from tags
+    text = SOUND_TAG_REGEX.sub("", content).replace("\n", " ")
+    if "<" not in text and "&" not in text:
+        return SPACES_REGEX.sub(" ", text).strip()
+
+    text = COMMENT_REGEX.sub("", text)
+    text = DROPPED_ELEMENT_REGEX.sub("", text)
+
+    # First image of the field is shown on the tile, its remaining text becomes a plain caption
+    image = IMAGE_SOURCE_REGEX.search(text)
+    if image:
+        filename = _media_filename(image.group(1))
+        if filename:
+            return ImageField(filename, _plain(TAG_REGEX.sub(_caption_tag, text)))
+
+    text = TAG_REGEX.sub(_sanitize_tag, text)
+
+    if TAG_REGEX.search(text.replace("<br>", "")):
+        return RichText(LINES_REGEX.sub("<br>", SPACES_REGEX.sub(" ", text.replace("<br>", "\n")).strip()))
+    return _plain(text)
+
+
+def _encode(text: str) -> tuple[int, str, str]:
+    if isinstance(text, ImageField):
+        return KIND_IMAGE, str(text), text.caption
+    return (KIND_RICH if isinstance(text, RichText) else KIND_PLAIN), str(text), ""
+
+
+def _decode(kind: int, text: str, caption: str) -> str:
+    if kind == KIND_IMAGE:
+        return ImageField(text, caption)
+    return RichText(text) if kind == KIND_RICH else text
+
+
+class FieldTextCache:
+    # LRU of normalized fields in front of FieldTextStore (sidecar, kept between Anki sessions).
+    # Note mtime is part of the key, edited notes are normalized again.
+    def __init__(self, max_entries: int = FIELD_CACHE_ENTRIES, store: FieldTextStore | None = None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: OrderedDict[tuple[int, int, int], str] = OrderedDict()
+
+    def normalized(self, note_id: int, note_mtime: int, field_ord: int, content: str) -> str:
+        return self.normalized_many([(note_id, note_mtime, field_ord, content)])[0]
+
+    def normalized_many(self, fields: Sequence[tuple[int, int, int, str]]) -> list[str]:
+        # fields: (note id, note mtime, field ord, raw content); one sidecar lookup and write for all of them
+        results: list[str | None] = [None] * len(fields)
+        missing = []
+        for index, (note_id, note_mtime, field_ord, _content) in enumerate(fields):
+            key = (note_id, note_mtime, field_ord)
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                results[index] = text
+            else:
+                missing.append(index)
+        if not missing:
+            return results
+
+        keys = [fields[index][:3] for index in missing]
+        stored = self.store.load(keys, NORMALIZER_VERSION) if self.store else {}
+
+        new_rows = {}
+        for index, key in zip(missing, keys):
+            row = stored.get(key)
+            if row is not None:
+                text = _decode(*row)
+            else:
+                text = normalize_field(fields[index][3])
+                new_rows[key] = (*key, *_encode(text))
+            results[index] = text
+            self._remember(key, text)
+
+        if new_rows and self.store:
+            self.store.store(new_rows.values(), NORMALIZER_VERSION)
+        return results
+
+    def _remember(self, key: tuple[int, int, int], text: str) -> None:
+        self._entries[key] = text
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Shared by all games, backed by user_files/snapshots.sqlite
+field_text_cache = FieldTextCache(store=FieldTextStore())
@@ -0,0 +1,58 @@
+from typing import NamedTuple
+
+from aqt import mw
+
+from .enums import TimekeepingMode
+
+
+class GameConfig(NamedTuple):
+    # Everything set in config window, saved in add-on config (config.json defaults) on every game start
+    deck: str = ""
+    note_type: str = ""
+    vocab_field: str = ""
+    meaning_field: str = ""
+    audio_field: str = ""
+    card_selection_mode: int = 0
+    card_order: str = "random"
+    confusable_pages: bool = False
+    update_stats: bool = False
+    cards_per_page: int = 10
+    columns: int = 4
+    font_size: int = 13
+    screen_width: int = 1600
+    screen_height: int = 900
+    animation_type: str = "fade"
+    animation_time: float = 0.5
+    timekeeping_mode: int = 0
+    countdown_per_page: str = "00:02:00"         # hh:mm:ss
+    countdown_for_all_cards: str = "00:10:00"    # hh:mm:ss
+
+    @property
+    def is_complete(self) -> bool:
+        # Enough to start a game without config window
+        return bool(self.deck and self.note_type and self.vocab_field and self.meaning_field)
+
+    @property
+    def timekeeping(self) -> TimekeepingMode:
+        # Out of range value (hand edited config) falls back to default mode
+        try:
+            return TimekeepingMode(self.timekeeping_mode)
+        except ValueError:
+            return TimekeepingMode(GameConfig._field_defaults["timekeeping_mode"])
+
+
+def load_game_config() -> GameConfig:
+    config = mw.addonManager.getConfig(__name__) or {}
+    defaults = GameConfig()
+    # Unknown keys are ignored, values of wrong type (hand edited config) fall back to defaults
+    values = {}
+    for key, default in defaults._asdict().items():
+        value = config.get(key, default)
+        if isinstance(default, float) and isinstance(value, int):
+            value = float(value)
+        values[key] = value if type(value) is type(default) else default
+    return GameConfig(**values)
+
+
+def save_game_config(config: GameConfig) -> None:
+    mw.addonManager.writeConfig(__name__, config._asdict())
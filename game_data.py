@@ -0,0 +1,140 @@
+import random
+from typing import Callable
+
+from anki.collection import Collection
+
+from .cancellation import CancellationToken
+from .card_loader import field_indexes, load_cards, playable_card_ids
+from .card_sampler import difficulty_weighted_shuffle
+from .confusable_pages import confusable_order
+from .page_source import PageSource
+from .scheduled_pool import get_limited_scheduled_cards
+from .snapshot_cache import SnapshotKey, snapshot_cache
+
+# Card order in game
+SAMPLING_RANDOM = "random"
+SAMPLING_DIFFICULTY = "difficulty"
+
+# Share of the progress bar used by every pipeline stage (in %)
+PROGRESS_QUERY_DONE = 10
+PROGRESS_EXTRACT_DONE = 95
+
+
+class PreparationCancelled(Exception):
+    # User pressed Cancel while game data was prepared
+    pass
+
+
+class NoCardsFound(Exception):
+    # Selected deck / mode returned no cards
+    pass
+
+
+class NoFieldContent(Exception):
+    # Cards were found, but none has content in both Vocab and Meaning fields
+    pass
+
+
+def card_ids_for_mode(col: Collection, deck_name: str, mode_index: int) -> list[int]:
+    # Base query limiting to the selected deck
+    # We use quotes around deck name to handle spaces safely
+    base_query = f'deck:"{deck_name}"'
+
+    status_query = ""
+
+    if mode_index == 0:
+        # Mode: All cards
+        # No status filter needed, fetches entire deck (including suspended).
+        pass
+
+    elif mode_index == 1:
+        # Mode: All ready cards (No limits)
+        # FIX: Previously 'is:due' missed 'is:new' cards.
+        # Now we explicitly ask for New, Due (Review), and Learn queues.
+        status_query = "(is:new OR is:due OR is:learn)"
+
+    elif mode_index == 2:
+        # Mode: Scheduled pool (Daily limits)
+        # Delegates logic to scheduled_pool module to apply per-deck limits
+        # based on card type priority (Learn > Due > New).
+        return get_limited_scheduled_cards(col, deck_name)
+
+    # Combine deck query with status query
+    full_query = f"{base_query} {status_query}".strip()
+
+    # Execute search in Anki collection
+    return list(col.find_cards(full_query))
+
+
+def prepare_game_data(col: Collection, *, deck_name: str, mode_index: int, note_type_id: int,
+                      vocab_field: str, meaning_field: str, audio_field: str,
+                      token: CancellationToken,
+                      on_progress: Callable[[int], None] | None = None,
+                      sampling: str = SAMPLING_RANDOM,
+                      confusable_page_size: int = 0) -> list[int]:
+    # Whole pipeline for MatchingExam data: mode query -> field check -> shuffle (-> confusable pages).
+    # confusable_page_size > 0 groups cards with similar texts on pages of that size.
+    # Returns shuffled ids of playable cards, field content is loaded later page by page (PageSource).
+    # Runs in background thread; on_progress gets percent (0-100) and must be thread safe.
+    def report(percent: int) -> None:
+        if token.is_cancelled:
+            raise PreparationCancelled()
+        if on_progress:
+            on_progress(percent)
+
+    report(0)
+
+    # Playable cards of the same selection are reused while the collection is unchanged
+    # (confusable pages need field texts, those are always extracted again)
+    snapshot_key = SnapshotKey(col.path, col.decks.id_for_name(deck_name) or 0, note_type_id,
+                               vocab_field, meaning_field, audio_field, mode_index)
+    col_mod, today = col.mod, col.sched.today
+    playable_ids = None if confusable_page_size else snapshot_cache.load(snapshot_key, col_mod, today)
+
+    if playable_ids:
+        texts = None
+        report(PROGRESS_EXTRACT_DONE)
+    else:
+        # 1. Fetch card IDs for selected card pool mode
+        card_ids = card_ids_for_mode(col, deck_name, mode_index)
+        if not card_ids:
+            raise NoCardsFound()
+        report(PROGRESS_QUERY_DONE)
+
+        # 2. Keep cards with content in Vocab and Meaning fields, chunk by chunk
+        ords = field_indexes(col, note_type_id, vocab_field, meaning_field, audio_field)
+        processed = 0
+
+        def on_chunk(count: int) -> None:
+            nonlocal processed
+            processed += count
+            span = PROGRESS_EXTRACT_DONE - PROGRESS_QUERY_DONE
+            report(PROGRESS_QUERY_DONE + span * processed // len(card_ids))
+
+        texts = {} if confusable_page_size else None
+        playable_ids = playable_card_ids(col, card_ids, note_type_id, ords, on_chunk, texts)
+        if not playable_ids:
+            raise NoFieldContent()
+
+        snapshot_cache.store(snapshot_key, col_mod, today, playable_ids)
+
+    # 3. Shuffle data, hard cards first in weighted mode
+    if sampling == SAMPLING_DIFFICULTY:
+        playable_ids = difficulty_weighted_shuffle(col, playable_ids)
+    else:
+        random.shuffle(playable_ids)
+
+    # 4. Similar cards on the same page, pages follow the order above
+    if confusable_page_size:
+        report(PROGRESS_EXTRACT_DONE)
+        playable_ids = confusable_order(playable_ids, [texts[cid] for cid in playable_ids], confusable_page_size)
+    report(100)
+
+    return playable_ids
+
+
+def game_page_source(col: Collection, card_ids: list[int], page_size: int, note_type_id: int,
+                     vocab_field: str, meaning_field: str, audio_field: str) -> PageSource:
+    # Page source for MatchingExam loading field content of the selected cards on demand
+    ords = field_indexes(col, note_type_id, vocab_field, meaning_field, audio_field)
+    return PageSource(card_ids, page_size, lambda ids: load_cards(col, ids, note_type_id, ords))
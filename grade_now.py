@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Callable, Sequence
 
 from anki.cards import CardId
 from anki.scheduler.v3 import CardAnswer
@@ -7,28 +7,35 @@ from aqt.qt import QWidget
 from aqt.utils import tooltip, tr
 
 
+def rating_for_ease(ease: int):
+    if ease == 1:
+        return CardAnswer.AGAIN
+    elif ease == 2:
+        return CardAnswer.HARD
+    elif ease == 3:
+        return CardAnswer.GOOD
+    else:
+        return CardAnswer.EASY
+
+
 def grade_now(
     *,
     parent: QWidget,
     card_ids: Sequence[CardId],
     ease: int,
+    on_success: Callable[[], None] | None = None,
 ) -> CollectionOp:
-    if ease == 1:
-        rating = CardAnswer.AGAIN
-    elif ease == 2:
-        rating = CardAnswer.HARD
-    elif ease == 3:
-        rating = CardAnswer.GOOD
-    else:
-        rating = CardAnswer.EASY
+    rating = rating_for_ease(ease)
+
+    def success(_) -> None:
+        tooltip(tr.scheduling_graded_cards_done(cards=len(card_ids)), parent=parent)
+        if on_success:
+            on_success()
+
     return CollectionOp(
         parent,
         lambda col: col._backend.grade_now(
             card_ids=card_ids,
             rating=rating,
         ),
-    ).success(
-        lambda _: tooltip(
-            tr.scheduling_graded_cards_done(cards=len(card_ids)), parent=parent
-        )
-    )
+    ).success(success)
@@ -0,0 +1,113 @@
+from aqt import gui_hooks, mw
+from aqt.qt import QObject, QTimer, QWidget
+from aqt.utils import showWarning
+
+from .grade_now import grade_now, rating_for_ease
+
+# Pending cards are graded at least this often, even if page is not finished
+FLUSH_INTERVAL_MS = 30 * 1000
+
+# Failed grading is retried after RETRY_DELAY_MS * attempt number
+MAX_RETRIES = 3
+RETRY_DELAY_MS = 2000
+
+
+class GradingQueue(QObject):
+    # Collects matched card ids and grades them with one grade_now() call
+    # per page / timer tick / window close, instead of one CollectionOp per match.
+    # Failed batch goes back to the queue and is retried; on profile close
+    # cards still waiting are graded synchronously, so no match is lost.
+
+    def __init__(self, parent: QWidget, ease: int = 2):
+        super().__init__(parent)
+        self.parent_widget = parent
+        self.ease = ease
+
+        # Ordered set of card ids waiting for grading
+        self.pending: dict[int, None] = {}
+        # Batch currently processed by CollectionOp
+        self.in_flight: list[int] = []
+        self.retries = 0
+        self.closed = False
+        # Profile closed, collection is gone: nothing is scheduled any more
+        self.stopped = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FLUSH_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+
+        gui_hooks.profile_will_close.append(self.flush_now)
+
+    def add(self, card_id: int) -> None:
+        self.pending[card_id] = None
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self) -> None:
+        self.timer.stop()
+
+        # One batch at a time, cards added meanwhile go with the next one
+        if self.stopped or not self.pending or self.in_flight:
+            return
+
+        self.in_flight = list(self.pending)
+        self.pending.clear()
+
+        # Game window can be already closed, main window stays
+        parent = mw if self.closed else self.parent_widget
+        grade_now(
+            parent=parent,
+            card_ids=self.in_flight,
+            ease=self.ease,
+            on_success=self._on_success,
+        ).failure(self._on_failure).run_in_background()
+
+    def close(self) -> None:
+        # Called when game window closes: grade everything left
+        self.closed = True
+        self.flush()
+        self._unregister_if_done()
+
+    def flush_now(self) -> None:
+        # Anki profile is closing: pending cards are graded synchronously.
+        # Batch in flight is left to its running CollectionOp (backend finishes the call before
+        # collection is closed); grading it here as well would add second revlog entries.
+        self.timer.stop()
+        self.stopped = True
+        card_ids = [cid for cid in self.pending if cid not in self.in_flight]
+        if card_ids and mw.col:
+            mw.col._backend.grade_now(card_ids=card_ids, rating=rating_for_ease(self.ease))
+        self.pending.clear()
+        # Not removed while the hook is running (other add-ons' hooks would be skipped)
+        QTimer.singleShot(0, lambda: gui_hooks.profile_will_close.remove(self.flush_now))
+
+    def _on_success(self) -> None:
+        self.in_flight = []
+        self.retries = 0
+
+        if self.pending and (self.closed or not self.timer.isActive()):
+            self.flush()
+        self._unregister_if_done()
+
+    def _on_failure(self, error: Exception) -> None:
+        if self.stopped:
+            # Collection closed meanwhile, there is nothing to retry with
+            self.in_flight = []
+            return
+
+        # Put batch back in front of cards added in the meantime
+        self.pending = dict.fromkeys(self.in_flight + list(self.pending))
+        self.in_flight = []
+        self.retries += 1
+
+        if self.retries <= MAX_RETRIES:
+            QTimer.singleShot(RETRY_DELAY_MS * self.retries, self.flush)
+        else:
+            # Keep cards queued, next flush (page, timer, close) tries again
+            self.retries = 0
+            showWarning(f"Failed to update card status: {error}")
+
+    def _unregister_if_done(self) -> None:
+        if self.closed and not self.stopped and not self.pending and not self.in_flight:
+            gui_hooks.profile_will_close.remove(self.flush_now)
@@ -2,6 +2,7 @@
 from PyQt6.QtWidgets import QMainWindow
 from aqt import mw
 from .ui.exam_creator_tab import ExamCreatorTab
+from .ui.game_launcher import replay_last_game
 
 from .translation import tr
 
@@ -12,3 +13,8 @@ def launch_matching_config():
     mw.matching_config_win.setCentralWidget(ExamCreatorTab())
     mw.matching_config_win.resize(600, 450)
     mw.matching_config_win.show()
+
+
+def launch_last_game():
+    # Game with last saved settings; config window opens when there is no game to replay yet
+    replay_last_game(on_missing_config=launch_matching_config)
@@ -0,0 +1,67 @@
+from array import array
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+# Pages kept in memory ahead of the current one
+DEFAULT_PREFETCH_PAGES = 1
+
+
+class PageSource:
+    # Feeds MatchingExam page by page.
+    # Holds only shuffled card ids; field content is loaded by `loader` for the current page
+    # and a bounded window of next pages, older pages are dropped.
+
+    def __init__(self, card_ids: Sequence[int], page_size: int,
+                 loader: Callable[[Sequence[int]], list[tuple[str, str, str, int]]],
+                 prefetch_pages: int = DEFAULT_PREFETCH_PAGES):
+        self.card_ids = array("q", card_ids)
+        self.page_size = page_size
+        self.loader = loader
+        self.prefetch_pages = prefetch_pages
+
+        # page index -> list of (vocab, meaning, audio, card_id)
+        self._pages: OrderedDict[int, list[tuple[str, str, str, int]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.card_ids)
+
+    @property
+    def total_pages(self) -> int:
+        return (len(self.card_ids) + self.page_size - 1) // self.page_size
+
+    def page_card_ids(self, index: int) -> Sequence[int]:
+        start = index * self.page_size
+        return self.card_ids[start:start + self.page_size]
+
+    def page(self, index: int) -> list[tuple[str, str, str, int]]:
+        # Data of page `index`, loaded now if it wasn't prefetched
+        if index not in self._pages:
+            self._load([index])
+        data = self._pages[index]
+        self._evict(index)
+        return data
+
+    def peek(self, index: int) -> list[tuple[str, str, str, int]] | None:
+        # Data of page `index` only if it's already loaded (no loading, no eviction)
+        return self._pages.get(index)
+
+    def prefetch(self, index: int) -> None:
+        # Load pages after `index` within prefetch window (one loader call for all missing pages)
+        missing = [
+            i for i in range(index + 1, min(index + 1 + self.prefetch_pages, self.total_pages))
+            if i not in self._pages
+        ]
+        if missing:
+            self._load(missing)
+
+    def _load(self, indexes: list[int]) -> None:
+        ids = [cid for i in indexes for cid in self.page_card_ids(i)]
+        by_id = {row[3]: row for row in self.loader(ids)}
+        for i in indexes:
+            self._pages[i] = [by_id[cid] for cid in self.page_card_ids(i) if cid in by_id]
+
+    def _evict(self, current: int) -> None:
+        # Keep only current page and the prefetch window
+        for i in list(self._pages):
+            if i < current or i > current + self.prefetch_pages:
+                del self._pages[i]
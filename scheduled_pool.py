@@ -0,0 +1,53 @@
+from anki.collection import Collection
+
+# Anki card queues (anki.consts: QUEUE_TYPE_NEW, QUEUE_TYPE_LRN, QUEUE_TYPE_REV)
+QUEUE_NEW = 0
+QUEUE_LEARN = 1
+QUEUE_REVIEW = 2
+
+
+def deck_ids_with_children(col: Collection, deck_id: int) -> list[int]:
+    # deck:"name" search includes subdecks, so every query here does the same
+    return list(col.decks.deck_and_child_ids(deck_id))
+
+
+def deck_filter_sql(deck_ids: list[int]) -> tuple[str, list[int]]:
+    # Cards moved to filtered decks still belong to home deck (odid), like in deck:"name" search
+    placeholders = ",".join("?" * len(deck_ids))
+    return f"(did in ({placeholders}) or odid in ({placeholders}))", deck_ids + deck_ids
+
+
+def get_limited_scheduled_cards(col: Collection, deck_name: str) -> list[int]:
+    # Scheduled pool: Learn > Due > New, Due and New cut at deck's daily limits.
+    # Only (id) columns are read and limits are applied by SQL, so memory stays O(limit).
+    did = col.decks.id_for_name(deck_name)
+    if not did:
+        return []
+
+    # 1. Get Daily Limits
+    conf = col.decks.config_dict_for_deck_id(did)
+    new_limit = conf['new']['perDay']
+    review_limit = conf['rev']['perDay']
+
+    deck_sql, deck_args = deck_filter_sql(deck_ids_with_children(col, did))
+
+    # 2. Learn: oldest step first, not limited by daily review limit
+    learn_ids = col.db.list(
+        f"select id from cards where {deck_sql} and queue = ? order by due",
+        *deck_args, QUEUE_LEARN,
+    )
+
+    # 3. Due: reviews due today or earlier, oldest due date first
+    due_ids = col.db.list(
+        f"select id from cards where {deck_sql} and queue = ? and due <= ? order by due limit ?",
+        *deck_args, QUEUE_REVIEW, col.sched.today, review_limit,
+    ) if review_limit > 0 else []
+
+    # 4. New: order by card id (date added) for a consistent order
+    new_ids = col.db.list(
+        f"select id from cards where {deck_sql} and queue = ? order by id limit ?",
+        *deck_args, QUEUE_NEW, new_limit,
+    ) if new_limit > 0 else []
+
+    # 5. Combine (Learn first, then Due, then New), dropping duplicates but keeping priority order
+    return list(dict.fromkeys(learn_ids + due_ids + new_ids))
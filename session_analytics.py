@@ -0,0 +1,194 @@
+import statistics
+import time
+from array import array
+from typing import NamedTuple
+
+from .enums import SessionEvent
+from .session_recorder import SESSIONS_DIR, read_session_file, session_files
+
+# NumPy is not shipped with Anki; if user has it, aggregation is vectorized
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Number of cards in "slowest" / "most missed" lists
+TOP_CARDS = 20
+
+
+class SessionHistory(NamedTuple):
+    # All recorded sessions concatenated into flat columns
+    time_ns: array
+    card_ids: array
+    values: array
+    events: array
+    session_lengths: list[int]      # number of events of every session, in order
+    session_started_ms: list[int]   # unix ms of every session start
+
+
+class CardStats(NamedTuple):
+    card_id: int
+    matches: int
+    mistakes: int
+    error_rate: float           # mistakes / (matches + mistakes)
+    median_match_ms: float      # median time from previous match / page load to matching this card
+
+
+class SessionAnalytics(NamedTuple):
+    sessions: int
+    events: int
+    matches: int
+    mistakes: int
+    cards: list[CardStats]
+    accuracy_by_month: list[tuple[str, float]]     # ("YYYY-MM", accuracy %)
+    slowest_cards: list[CardStats]
+    most_missed_cards: list[CardStats]
+
+
+def load_history(directory: str = SESSIONS_DIR) -> SessionHistory:
+    time_ns, card_ids, values, events = array("q"), array("q"), array("i"), array("B")
+    lengths, started = [], []
+
+    for path in session_files(directory):
+        started_at, s_time, s_cards, s_values, s_events = read_session_file(path)
+        if not s_events:
+            continue
+        time_ns.extend(s_time)
+        card_ids.extend(s_cards)
+        values.extend(s_values)
+        events.extend(s_events)
+        lengths.append(len(s_events))
+        started.append(started_at)
+
+    return SessionHistory(time_ns, card_ids, values, events, lengths, started)
+
+
+def _month(started_ms: int) -> str:
+    return time.strftime("%Y-%m", time.localtime(started_ms / 1000))
+
+
+def _accuracy(matches: int, mistake_events: int) -> float:
+    # Every wrong pair is logged as two MISTAKE events (one per tile)
+    tries = matches + mistake_events / 2
+    return round(matches / tries * 100, 2) if tries else 0.0
+
+
+def analyze(history: SessionHistory, top: int = TOP_CARDS) -> SessionAnalytics:
+    if np is not None and len(history.events):
+        cards, by_month = _aggregate_numpy(history)
+    else:
+        cards, by_month = _aggregate_python(history)
+
+    matches = sum(card.matches for card in cards)
+    mistakes = sum(card.mistakes for card in cards)
+
+    timed_cards = [card for card in cards if card.matches]
+    slowest = sorted(timed_cards, key=lambda c: c.median_match_ms, reverse=True)[:top]
+    most_missed = sorted(cards, key=lambda c: (c.error_rate, c.mistakes), reverse=True)[:top]
+
+    accuracy_by_month = [(month, _accuracy(m, w)) for month, (m, w) in sorted(by_month.items())]
+
+    return SessionAnalytics(
+        sessions=len(history.session_lengths),
+        events=len(history.events),
+        matches=matches,
+        mistakes=mistakes,
+        cards=cards,
+        accuracy_by_month=accuracy_by_month,
+        slowest_cards=slowest,
+        most_missed_cards=most_missed,
+    )
+
+
+def _aggregate_python(history: SessionHistory):
+    # Single pass over all events, used when NumPy isn't available
+    match_times: dict[int, list[float]] = {}
+    mistakes: dict[int, int] = {}
+    by_month: dict[str, list[int]] = {}
+
+    MATCH, MISTAKE = SessionEvent.MATCH, SessionEvent.MISTAKE
+    ANCHORS = (SessionEvent.MATCH, SessionEvent.PAGE_LOADED, SessionEvent.SESSION_START)
+
+    time_ns, card_ids, events = history.time_ns, history.card_ids, history.events
+    index = 0
+    for length, started_ms in zip(history.session_lengths, history.session_started_ms):
+        month = by_month.setdefault(_month(started_ms), [0, 0])
+        anchor_ns = time_ns[index]
+        for i in range(index, index + length):
+            event = events[i]
+            if event == MATCH:
+                match_times.setdefault(card_ids[i], []).append((time_ns[i] - anchor_ns) / 1e6)
+                month[0] += 1
+            elif event == MISTAKE:
+                mistakes[card_ids[i]] = mistakes.get(card_ids[i], 0) + 1
+                month[1] += 1
+            if event in ANCHORS:
+                anchor_ns = time_ns[i]
+        index += length
+
+    cards = []
+    for cid in match_times.keys() | mistakes.keys():
+        times = match_times.get(cid, [])
+        wrong = mistakes.get(cid, 0)
+        cards.append(CardStats(
+            card_id=cid,
+            matches=len(times),
+            mistakes=wrong,
+            error_rate=wrong / (len(times) + wrong),
+            median_match_ms=statistics.median(times) if times else 0.0,
+        ))
+    return cards, by_month
+
+
+def _aggregate_numpy(history: SessionHistory):
+    t = np.frombuffer(history.time_ns, dtype=np.int64)
+    cid = np.frombuffer(history.card_ids, dtype=np.int64)
+    ev = np.frombuffer(history.events, dtype=np.uint8)
+    n = len(ev)
+
+    # Time to match: from the latest anchor (previous match, page load, session start) before the event.
+    # Every session begins with SESSION_START, so forward-fill never crosses sessions.
+    anchor = (ev == SessionEvent.MATCH) | (ev == SessionEvent.PAGE_LOADED) | (ev == SessionEvent.SESSION_START)
+    last_anchor = np.maximum.accumulate(np.where(anchor, np.arange(n), 0))
+    previous_anchor = np.concatenate(([0], last_anchor[:-1]))
+
+    is_match = ev == SessionEvent.MATCH
+    is_mistake = ev == SessionEvent.MISTAKE
+    match_cards = cid[is_match]
+    match_ms = (t[is_match] - t[previous_anchor[is_match]]) / 1e6
+
+    # Per card counts
+    all_cards = np.union1d(match_cards, cid[is_mistake])
+    match_counts = np.bincount(np.searchsorted(all_cards, match_cards), minlength=len(all_cards))
+    mistake_counts = np.bincount(np.searchsorted(all_cards, cid[is_mistake]), minlength=len(all_cards))
+
+    # Per card median: sort by (card, time), take middle of every group
+    medians = np.zeros(len(all_cards))
+    if len(match_cards):
+        order = np.lexsort((match_ms, match_cards))
+        sorted_cards = match_cards[order]
+        sorted_ms = match_ms[order]
+        group_start = np.concatenate(([0], np.flatnonzero(np.diff(sorted_cards)) + 1))
+        group_len = np.diff(np.concatenate((group_start, [len(sorted_ms)])))
+        low = sorted_ms[group_start + (group_len - 1) // 2]
+        high = sorted_ms[group_start + group_len // 2]
+        medians[np.searchsorted(all_cards, sorted_cards[group_start])] = (low + high) / 2
+
+    error_rates = mistake_counts / (match_counts + mistake_counts)
+
+    cards = [
+        CardStats(int(c), int(m), int(w), float(e), float(md))
+        for c, m, w, e, md in zip(all_cards, match_counts, mistake_counts, error_rates, medians)
+    ]
+
+    # Matches / mistakes per month of session start
+    months = [_month(ms) for ms in history.session_started_ms]
+    month_codes, month_of_session = np.unique(months, return_inverse=True)
+    month_of_event = np.repeat(month_of_session, history.session_lengths)
+    month_matches = np.bincount(month_of_event[is_match], minlength=len(month_codes))
+    month_mistakes = np.bincount(month_of_event[is_mistake], minlength=len(month_codes))
+    by_month = {
+        str(month): [int(m), int(w)] for month, m, w in zip(month_codes, month_matches, month_mistakes)
+    }
+
+    return cards, by_month
@@ -0,0 +1,120 @@
+import os
+import struct
+import sys
+import time
+from array import array
+
+from .enums import SessionEvent
+
+SESSIONS_DIR = os.path.join(os.path.dirname(__file__), "user_files", "sessions")
+SESSION_FILE_EXTENSION = ".mags"
+
+# Every flush appends one block: header + columns (all little-endian)
+#   header:  magic, format version, number of events, session start (unix ms)
+#   columns: time_ns[q] * n, card_id[q] * n, value[i] * n, event[B] * n
+BLOCK_MAGIC = b"MAGS"
+FORMAT_VERSION = 1
+BLOCK_HEADER = struct.Struct("<4sHIq")
+
+# Buffer is written to disk when it reaches this size (and on session end)
+FLUSH_EVENTS = 4096
+
+
+class SessionRecorder:
+    # Append-only, array-backed log of game events with monotonic nanosecond timestamps.
+    # record() only appends to preallocated-type arrays, disk is touched on flush.
+
+    def __init__(self, directory: str = SESSIONS_DIR):
+        self.started_at_ms = int(time.time() * 1000)
+        self.path = os.path.join(directory, f"session_{self.started_at_ms}{SESSION_FILE_EXTENSION}")
+
+        self.time_ns = array("q")
+        self.card_ids = array("q")
+        self.values = array("i")
+        self.events = array("B")
+        self.closed = False
+
+        self.record(SessionEvent.SESSION_START)
+
+    def record(self, event: SessionEvent, card_id: int = 0, value: int = 0) -> None:
+        self.time_ns.append(time.monotonic_ns())
+        self.card_ids.append(card_id)
+        self.values.append(value)
+        self.events.append(event)
+
+        if len(self.events) >= FLUSH_EVENTS:
+            self.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.record(SessionEvent.SESSION_END)
+        self.flush()
+
+    def flush(self) -> None:
+        count = len(self.events)
+        if not count:
+            return
+
+        columns = (self.time_ns, self.card_ids, self.values, self.events)
+        if sys.byteorder == "big":
+            for column in columns:
+                column.byteswap()
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(BLOCK_HEADER.pack(BLOCK_MAGIC, FORMAT_VERSION, count, self.started_at_ms))
+                for column in columns:
+                    column.tofile(f)
+        except OSError:
+            # Statistics are optional, game must go on
+            pass
+
+        for column in columns:
+            del column[:]
+
+
+def read_session_file(path: str) -> tuple[int, array, array, array, array]:
+    # Returns session start (unix ms) and columns (time_ns, card_ids, values, events) of all blocks in the file
+    started_at = 0
+    time_ns, card_ids, values, events = array("q"), array("q"), array("i"), array("B")
+
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                break
+            magic, version, count, started_at_ms = BLOCK_HEADER.unpack(header)
+            if magic != BLOCK_MAGIC or version != FORMAT_VERSION:
+                break
+            started_at = started_at_ms
+
+            try:
+                block = [array(typecode) for typecode in "qqiB"]
+                for column in block:
+                    column.fromfile(f, count)
+            except EOFError:
+                # Truncated block (e.g. Anki was killed during write)
+                break
+
+            if sys.byteorder == "big":
+                for column in block:
+                    column.byteswap()
+
+            time_ns.extend(block[0])
+            card_ids.extend(block[1])
+            values.extend(block[2])
+            events.extend(block[3])
+
+    return started_at, time_ns, card_ids, values, events
+
+
+def session_files(directory: str = SESSIONS_DIR) -> list[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(SESSION_FILE_EXTENSION)
+    )
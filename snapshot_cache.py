@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import closing
+from typing import Iterable, NamedTuple
+
+SNAPSHOT_DB = os.path.join(os.path.dirname(__file__), "user_files", "snapshots.sqlite")
+
+# Least recently used snapshots above this number are removed
+MAX_SNAPSHOTS = 50
+# Normalized fields stored before the last MAX_FIELD_TEXTS ones are removed
+MAX_FIELD_TEXTS = 200000
+# Number of (note id, field ord) pairs looked up in one query (2 host parameters each)
+FIELD_LOOKUP_CHUNK = 400
+
+
+class SnapshotKey(NamedTuple):
+    # Everything deciding which cards are playable
+    collection: str         # collection path, one sidecar serves all profiles
+    deck_id: int
+    note_type_id: int
+    vocab_field: str
+    meaning_field: str
+    audio_field: str
+    mode_index: int
+
+
+class SnapshotCache:
+    # Playable card ids of recently prepared games in an SQLite sidecar (user_files/snapshots.sqlite).
+    # A snapshot is valid while collection's modification time and scheduler day are the same,
+    # so relaunching a game skips the card query and field extraction.
+    # Connection is opened per call: it's used from background threads (QueryOp).
+
+    def __init__(self, path: str = SNAPSHOT_DB):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute(
+            "create table if not exists snapshots ("
+            "key text primary key, col_mod integer, today integer, used_at integer, card_ids blob)"
+        )
+        return db
+
+    def load(self, key: SnapshotKey, col_mod: int, today: int) -> list[int] | None:
+        try:
+            with closing(self._connect()) as db, db:
+                row = db.execute(
+                    "select card_ids from snapshots where key = ? and col_mod = ? and today = ?",
+                    (json.dumps(key), col_mod, today),
+                ).fetchone()
+                if row is None:
+                    return None
+                db.execute("update snapshots set used_at = ? where key = ?", (int(time.time()), json.dumps(key)))
+        except sqlite3.Error:
+            # Cache is only a shortcut, broken sidecar means preparing cards again
+            return None
+
+        card_ids = array("q")
+        card_ids.frombytes(row[0])
+        return card_ids.tolist()
+
+    def store(self, key: SnapshotKey, col_mod: int, today: int, card_ids: list[int]) -> None:
+        try:
+            with closing(self._connect()) as db, db:
+                db.execute(
+                    "insert or replace into snapshots (key, col_mod, today, used_at, card_ids) values (?, ?, ?, ?, ?)",
+                    (json.dumps(key), col_mod, today, int(time.time()), array("q", card_ids).tobytes()),
+                )
+                db.execute(
+                    "delete from snapshots where key not in "
+                    "(select key from snapshots order by used_at desc limit ?)",
+                    (MAX_SNAPSHOTS,),
+                )
+        except sqlite3.Error:
+            pass
+
+
+snapshot_cache = SnapshotCache()
+
+
+class FieldTextStore:
+    # Normalized note fields (field_text) kept in the same sidecar, so later sessions on the same
+    # deck skip normalization. Row is valid for one note mtime and normalizer version;
+    # edited note replaces its row. Rows are (note id, note mtime, field ord, kind, text, caption).
+    # Used on every page load, so each thread keeps its connection open (WAL, commits without fsync:
+    # losing last rows on power loss only means normalizing them again).
+
+    def __init__(self, path: str = SNAPSHOT_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path)
+            db.execute("pragma journal_mode = wal")
+            db.execute("pragma synchronous = normal")
+            db.execute(
+                "create table if not exists field_texts ("
+                "nid integer, ord integer, mod integer, version integer, kind integer, text text, caption text, "
+                "primary key (nid, ord))"
+            )
+            self._local.db = db
+        return db
+
+    def _drop_connection(self) -> None:
+        # Broken connection (e.g. sidecar deleted or locked) is opened again next time
+        db = getattr(self._local, "db", None)
+        self._local.db = None
+        if db is not None:
+            db.close()
+
+    def load(self, keys: list[tuple[int, int, int]], version: int) -> dict[tuple[int, int, int], tuple[int, str, str]]:
+        # (note id, note mtime, field ord) -> (kind, text, caption) of the stored ones
+        found = {}
+        try:
+            db = self._connection()
+            for start in range(0, len(keys), FIELD_LOOKUP_CHUNK):
+                chunk = keys[start:start + FIELD_LOOKUP_CHUNK]
+                condition = " or ".join(["(nid = ? and ord = ?)"] * len(chunk))
+                params = [value for nid, _mod, field_ord in chunk for value in (nid, field_ord)]
+                for nid, field_ord, mod, kind, text, caption in db.execute(
+                    f"select nid, ord, mod, kind, text, caption from field_texts "
+                    f"where version = ? and ({condition})",
+                    (version, *params),
+                ):
+                    found[(nid, mod, field_ord)] = (kind, text, caption)
+        except sqlite3.Error:
+            # Fields are normalized again
+            self._drop_connection()
+            return {}
+        # Rows of older note versions don't match any key
+        return {key: found[key] for key in keys if key in found}
+
+    def store(self, rows: Iterable[tuple[int, int, int, int, str, str]], version: int) -> None:
+        try:
+            with self._connection() as db:
+                db.executemany(
+                    "insert or replace into field_texts (nid, mod, ord, kind, text, caption, version) "
+                    "values (?, ?, ?, ?, ?, ?, ?)",
+                    [(*row, version) for row in rows],
+                )
+                # Replaced row gets new (highest) rowid, so rowid order is store order
+                db.execute(
+                    "delete from field_texts where rowid <= (select max(rowid) from field_texts) - ?",
+                    (MAX_FIELD_TEXTS,),
+                )
+        except sqlite3.Error:
+            self._drop_connection()
@@ -1,24 +1,21 @@
-from aqt.qt import QTimer, QLabel, QObject, pyqtSignal
+from aqt.qt import QLabel, QObject
 
+from .clock_service import MonotonicClock
 
-class TimerManager(QObject):
-    # Define a custom signal that is emitted when the timer reaches 0
+
+class TimerManager(QObject, MonotonicClock):
+    # Counts time up from start_timer(); refreshed by shared ClockService
 
     def __init__(self, timer_label: QLabel):
-        super().__init__()
+        QObject.__init__(self)
+        MonotonicClock.__init__(self)
 
         # State variables
-        self.secs_remaining: int = 0
         self.is_running: bool = False
 
         self.timer_seconds = 0
         self.timer_label = timer_label
 
-        # QTimer setup
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._update_cycle)
-        self.timer.setInterval(1000)  # 1000 ms = 1 second interval
-
         self.timer_label.setText("00:00")
 
     def start_timer(self) -> None:
@@ -26,18 +23,20 @@ class TimerManager(QObject):
         if self.is_running:
             self.stop_timer()
 
-        # Start the QTimer and update UI immediately
+        # Start the clock and update UI immediately
         self.is_running = True
-        self.timer.start()
+        self.start_clock()
         self._update_label()
 
-    def _update_cycle(self) -> None:
-        # Called every second by QTimer
+    def refresh(self, now: float) -> None:
+        # Called by ClockService on second boundaries
         if not self.is_running:
             return
 
-        self.timer_seconds += 1
-        self._update_label()
+        seconds = self.elapsed_seconds(now)
+        if seconds != self.timer_seconds:
+            self.timer_seconds = seconds
+            self._update_label()
 
     def _update_label(self) -> None:
         # Updates the QLabel with the time in MM:SS format
@@ -48,8 +47,7 @@ class TimerManager(QObject):
         self.timer_label.setText(f"{minutes:02d}:{seconds:02d}")
 
     def stop_timer(self) -> None:
-        # Stops the QTimer and resets the state flag
-        if self.timer.isActive():
-            self.timer.stop()
+        # Stops the clock and resets the state flag
+        self.stop_clock()
         self.is_running = False
         self.timer_seconds = 0
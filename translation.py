@@ -1,60 +1,138 @@
 import json
 import os
+import pickle
+from string import Formatter
+from types import MappingProxyType
+from typing import Mapping
+
 from aqt import mw
 
+I18N_DIR = os.path.join(os.path.dirname(__file__), "i18n")
+# Compiled catalogs, one per Anki language; rebuilt when any source JSON changes
+CATALOG_CACHE_DIR = os.path.join(os.path.dirname(__file__), "user_files", "i18n_cache")
+CATALOG_FORMAT_VERSION = 2
+
+BASE_LANGUAGE = "en"
+
+
+class Template:
+    # Text with {fields}, parsed and validated once when catalog is built.
+    # Formatting itself stays in C str.format_map (faster than joining parsed pieces in Python).
+    __slots__ = ("text", "fields")
+
+    def __init__(self, text: str, fields: frozenset[str] | None = None):
+        self.text = text
+        self.fields = fields if fields is not None else frozenset(
+            field for _literal, field, _spec, _conv in Formatter().parse(text) if field is not None)
+
+    def format(self, kwargs: dict) -> str:
+        try:
+            return self.text.format_map(kwargs)
+        except (KeyError, IndexError, ValueError):
+            # Missing variable - template shown as it is
+            return self.text
+
+
+def language_chain(full_code: str) -> list[str]:
+    # Most specific first, e.g. "pt_BR" -> ["pt_BR", "pt", "en"]
+    full_code = full_code.replace("-", "_")
+    chain = [full_code, full_code.split("_")[0], BASE_LANGUAGE]
+    return list(dict.fromkeys(chain))
+
+
+def _compile_text(text: str) -> str | Template:
+    if "{" not in text:
+        return text
+    try:
+        template = Template(text)
+    except ValueError:
+        # Unbalanced braces, shown as it is
+        return text
+    return template if template.fields else text
+
+
+def build_catalog(chain: list[str]) -> dict[str, str | Template]:
+    # Language files merged once: base language first, more specific ones overwrite its keys
+    catalog = {}
+    for code in reversed(chain):
+        path = os.path.join(I18N_DIR, f"{code}.json")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                catalog.update(json.load(f))
+    return {key: _compile_text(text) for key, text in catalog.items()}
+
+
+def _sources_state(chain: list[str]) -> tuple:
+    # mtime of every language file of the chain (None for missing ones, so new files are noticed)
+    state = []
+    for code in chain:
+        path = os.path.join(I18N_DIR, f"{code}.json")
+        state.append((code, os.stat(path).st_mtime_ns if os.path.exists(path) else None))
+    return CATALOG_FORMAT_VERSION, tuple(state)
+
+
+def compiled_catalog(full_code: str) -> Mapping[str, str | Template]:
+    # Frozen catalog for Anki language; pickled compiled catalog is used while JSON files are unchanged
+    chain = language_chain(full_code)
+    state = _sources_state(chain)
+    cache_path = os.path.join(CATALOG_CACHE_DIR, f"catalog_{chain[0]}.pickle")
+
+    # Pickle holds only built-in types (templates as (text, fields)), it doesn't depend on add-on module path
+    try:
+        with open(cache_path, "rb") as f:
+            cached_state, stored = pickle.load(f)
+        if cached_state == state:
+            return MappingProxyType({
+                key: Template(*value) if isinstance(value, tuple) else value for key, value in stored.items()
+            })
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+
+    catalog = build_catalog(chain)
+    stored = {
+        key: (value.text, value.fields) if isinstance(value, Template) else value for key, value in catalog.items()
+    }
+    try:
+        os.makedirs(CATALOG_CACHE_DIR, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump((state, stored), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # Read-only add-on folder, catalog is just built every time
+        pass
+    return MappingProxyType(catalog)
+
 
 class Translator:
     def __init__(self):
-        # Get language from Anki (e.g. "pl_PL", "pt_PT")
-
+        # Get language from Anki (e.g. "pl_PL", "pt_BR")
         full_code = mw.pm.meta.get("defaultLang", "en") or "en"
-        if full_code is None:
-            full_code = "en"
-
-        # Cut lang code (e.g.: pl_PL to pl)
-        self.lang_code = full_code.split('_')[0]
-
-        self.translations = {}
-        self.load_translations()
-
-    def load_translations(self):
-        base_dir = os.path.dirname(__file__)
-        i18n_dir = os.path.join(base_dir, "i18n")
-
-        # First load English as base
-        en_path = os.path.join(i18n_dir, "en.json")
-        if os.path.exists(en_path):
-            with open(en_path, "r", encoding="utf-8") as f:
-                self.translations = json.load(f)
-
-        # If user language is not English then load it and overwrite
-        if self.lang_code != "en":
-            lang_path = os.path.join(i18n_dir, f"{self.lang_code}.json")
-            if os.path.exists(lang_path):
-                with open(lang_path, "r", encoding="utf-8") as f:
-                    local_data = json.load(f)
-                    # Actualize vocabulary (overwrite keys)
-                    self.translations.update(local_data)
+
+        # Fallback chain (pt_BR -> pt -> en) is resolved here, lookups are one dict access
+        self.translations = compiled_catalog(full_code)
 
     def tr(self, key: str, **kwargs) -> str:
         # return translated text for selected key
         # handle formatting variable, ex. {count}
         # Get text, if there is no key - return key itself
-        text = self.translations.get(key, key)
-
-        # Handle dynamic formating (ex. insert numbers)
-        if kwargs:
-            try:
-                return text.format(**kwargs)
-            except KeyError:
-                return text
-        return text
+        entry = self.translations.get(key, key)
+        if type(entry) is str:
+            return entry
+
+        # Handle dynamic formating (ex. insert numbers) with pre-parsed template
+        return entry.format(kwargs) if kwargs else entry.text
+
+
+# One global instance, created on first use (JSON files are read only when add-on UI is opened)
+_manager: Translator | None = None
 
 
-# Create one, global instance
-manager = Translator()
+def translator() -> Translator:
+    global _manager
+    if _manager is None:
+        _manager = Translator()
+    return _manager
 
 
 # Short global function for convenience (same like in Qt tr())
 def tr(key: str, **kwargs) -> str:
-    return manager.tr(key, **kwargs)
+    return translator().tr(key, **kwargs)
@@ -1,28 +1,71 @@
 import sys
 from PyQt6.QtWidgets import (QApplication, QWidget, QGridLayout, QLabel,
-                             QPushButton, QSizePolicy, QGraphicsOpacityEffect)
-from PyQt6.QtCore import QPropertyAnimation, QEasingCurve, QPoint, QRect, QSize, QVariantAnimation, QTimer, Qt
-from PyQt6.QtGui import QColor, QPalette, QMouseEvent, QFont
+                             QPushButton, QSizePolicy, QStyle, QStyleOptionButton)
+from PyQt6.QtCore import QRectF, QSizeF, Qt
+from PyQt6.QtGui import (QColor, QPalette, QMouseEvent, QFont, QPainter, QPixmap, QTextDocument, QTextOption,
+                         QAbstractTextDocumentLayout)
+
+from .thumbnail_cache import ThumbnailCache, thumbnail_cache
+from .tile_animator import TileAnimator, default_animator
+from .tile_layout import TILE_IMAGE_SIZE
+from ..field_text import ImageField, RichText
+
+
+# Static style of every tile, shared by all AnimatedButton instances.
+# Dynamic colors (flash, match, timeout) and text are painted by the tile, not set by stylesheet.
+TILE_STYLE_SHEET = """
+    QPushButton {
+        border: 2px solid gray;
+        border-radius: 5px;
+        color: white;
+        background-color: transparent;
+        white-space: normal;
+        min-height: 40px;
+        padding: 5px;
+        text-align: center;
+    }
+
+    QPushButton:hover {
+        border-color: yellow;
+        background-color: rgba(100, 100, 100, 50);
+    }
+
+    QPushButton:pressed {
+        background-color: rgba(50, 50, 50, 255);
+        border-style: inset;
+    }
+
+    QPushButton:checked {
+        background-color: #55aaff;
+    }
+"""
 
 
 class AnimatedButton(QPushButton):
-    def __init__(self, text, animation_type='fade', animation_time=0.5, font_size=18):
+    def __init__(self, text, animation_type='fade', animation_time=0.5, font_size=18, animator: TileAnimator | None = None):
         super().__init__("")
 
-        # Declaration of empty vars
-        self.color_anim: QVariantAnimation | None = None
+        # Fade/shrink/flash are driven by page's shared animator
+        self.animator = animator if animator else default_animator()
 
-        self.label = QLabel(text, self)
-        self.label.setWordWrap(True)
-        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.label.setStyleSheet("QLabel { background-color: transparent; color: white; }")
-        self.label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        # Values written by animator, used in paintEvent
+        self.opacity = 1.0
+        self.scale = 1.0
+        self.offset_y = 0.0
+        self.overlay_alpha = 0.0
 
-        # Setup Font
-        font = QFont()
-        font.setPointSize(font_size)
-        self.label.setFont(font)
+        # Text is painted by button itself (painter opacity must apply to it as well)
+        self._text = ""
+        self._text_color = QColor("white")
+        self._text_document: QTextDocument | None = None     # only for rich text (HTML fields)
+
+        # Picture of image fields; None while thumbnail is decoded in background
+        self._image: QPixmap | None = None
+        self._thumbnails: ThumbnailCache | None = None
 
+        # Setup Font
+        self.text_font = QFont()
+        self.text_font.setPointSize(font_size)
 
         self.animation_type = animation_type
         # Every Animation time in milliseconds
@@ -30,36 +73,11 @@ class AnimatedButton(QPushButton):
 
         self.setFlat(True)
 
-        self.full_static_style = f"""
-                QPushButton {{ 
-                    border: 2px solid gray; 
-                    border-radius: 5px; 
-                    color: white;
-                    background-color: transparent; 
-                    white-space: normal;
-                    min-height: 40px; 
-                    padding: 5px;
-                    text-align: center;
-                }}
-
-                QPushButton:hover {{
-                    border-color: yellow;
-                    background-color: rgba(100, 100, 100, 50);
-                }}
-
-                QPushButton:pressed {{
-                    background-color: rgba(50, 50, 50, 255);
-                    border-style: inset;
-                }}
-
-                QPushButton:checked {{
-                    background-color: #55aaff;
-                }}
-            """
-
-        self.setStyleSheet(self.full_static_style)
-
-        self.base_css = "border: 2px solid gray; border-radius: 5px; color: white; white-space: normal; min-height: 40px; padding: 5px; text-align: center;"
+        # Same string for every tile, applied once per tile life (tiles are reused by TilePool)
+        self.setStyleSheet(TILE_STYLE_SHEET)
+
+        # Color painted over background: flash on mistake, green on match, red when time is over
+        self._overlay_color = QColor(Qt.GlobalColor.transparent)
 
         self.setCheckable(True)
 
@@ -69,19 +87,156 @@ class AnimatedButton(QPushButton):
 
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
 
+        self.setText(text)
 
-    # Overwrite event, for label always fulfill button
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self.label.setGeometry(self.rect().adjusted(5, 5, -5, -5))
 
-    # Redirect setText to Label
+    # Prepare used button to show new text (TilePool), instead of creating a new one
+    def reset(self, text):
+        # Stop every running animation and make tile fully visible again
+        self.animator.stop(self)
+        self.opacity = 1.0
+        self.scale = 1.0
+        self.offset_y = 0.0
+
+        # Remove flash/match overlay
+        self.restore_default_style()
+
+        self.setChecked(False)
+        self.setEnabled(True)
+
+        # Drop connection to previous page's handler
+        try:
+            self.clicked.disconnect()
+        except TypeError:
+            pass
+
+        self.setText(text)
+
     def setText(self, text):
-        self.label.setText(text)
+        self._text = text
+        self._image = None
+        if isinstance(text, ImageField):
+            self._request_image()
+        # Field content is normalized when page is loaded (field_text), only formatted text needs a document
+        if isinstance(text, RichText):
+            self._text_document = QTextDocument()
+            self._text_document.setDefaultFont(self.text_font)
+            self._text_document.setDefaultTextOption(QTextOption(Qt.AlignmentFlag.AlignCenter))
+            self._text_document.setHtml(text)
+            self._text_document.setTextWidth(self._text_rect().width())
+        else:
+            self._text_document = None
+        self.update()
 
-    # Redirect get Text from Label
     def text(self):
-        return self.label.text()
+        return self._text
+
+    def _request_image(self) -> None:
+        cache = thumbnail_cache()
+        if self._thumbnails is not cache:
+            cache.thumbnail_ready.connect(self._thumbnail_ready)
+            self._thumbnails = cache
+        self._image = cache.get(self._text, TILE_IMAGE_SIZE)
+
+    def _thumbnail_ready(self, key) -> None:
+        # Tile may show another card already (TilePool), only its own picture matters
+        if isinstance(self._text, ImageField) and key == ThumbnailCache.key(self._text, TILE_IMAGE_SIZE):
+            self._image = self._thumbnails.get(self._text, TILE_IMAGE_SIZE)
+            self.update()
+
+    def _text_rect(self) -> QRectF:
+        return QRectF(self.rect()).adjusted(5, 5, -5, -5)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._text_document:
+            self._text_document.setTextWidth(self._text_rect().width())
+
+    # Called by TileAnimator every frame
+    def set_animated_value(self, name: str, value: float) -> None:
+        setattr(self, name, value)
+
+    def paintEvent(self, event):
+        if self.opacity <= 0.0 or self.scale <= 0.0:
+            return
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setOpacity(self.opacity)
+
+        # Shrink / fly are painter transformations, widget geometry stays untouched
+        if self.offset_y:
+            painter.translate(0, self.offset_y)
+        if self.scale != 1.0:
+            center = QRectF(self.rect()).center()
+            painter.translate(center)
+            painter.scale(self.scale, self.scale)
+            painter.translate(-center)
+
+        # Border, background and hover/checked states come from the shared stylesheet
+        option = QStyleOptionButton()
+        self.initStyleOption(option)
+        option.text = ""
+        self.style().drawControl(QStyle.ControlElement.CE_PushButton, option, painter, self)
+
+        # Overlay inside the 2px border
+        if self.overlay_alpha > 0 and self._overlay_color.alpha() > 0:
+            overlay = QColor(self._overlay_color)
+            overlay.setAlpha(int(self.overlay_alpha))
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(overlay)
+            painter.drawRoundedRect(QRectF(self.rect()).adjusted(2, 2, -2, -2), 3, 3)
+
+        self._paint_text(painter)
+        painter.end()
+
+    def _paint_text(self, painter: QPainter) -> None:
+        text_rect = self._text_rect()
+
+        if isinstance(self._text, ImageField):
+            self._paint_image(painter, text_rect)
+            return
+
+        if self._text_document is None:
+            painter.setPen(self._text_color)
+            painter.setFont(self.text_font)
+            painter.drawText(text_rect, int(Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap), self._text)
+            return
+
+        # Rich text: vertically centered document, clipped to tile
+        doc_height = self._text_document.size().height()
+        painter.save()
+        painter.setClipRect(text_rect)
+        painter.translate(text_rect.left(), text_rect.top() + max(0.0, (text_rect.height() - doc_height) / 2))
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, self._text_color)
+        self._text_document.documentLayout().draw(painter, context)
+        painter.restore()
+
+    def _paint_image(self, painter: QPainter, rect: QRectF) -> None:
+        painter.setPen(self._text_color)
+        painter.setFont(self.text_font)
+
+        # Caption below the picture
+        caption = self._text.caption
+        if caption:
+            caption_height = painter.fontMetrics().lineSpacing() * (caption.count("\n") + 1)
+            caption_rect = QRectF(rect.left(), rect.bottom() - caption_height, rect.width(), caption_height)
+            painter.drawText(caption_rect, int(Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap), caption)
+            rect = rect.adjusted(0, 0, 0, -caption_height)
+
+        if self._image is None:
+            return
+        if self._image.isNull():
+            # Missing / unreadable file, show its name instead
+            painter.drawText(rect, int(Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap), str(self._text))
+            return
+
+        size = QSizeF(self._image.size()).scaled(rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        target = QRectF(rect.center().x() - size.width() / 2, rect.center().y() - size.height() / 2,
+                        size.width(), size.height())
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(target, self._image, QRectF(self._image.rect()))
 
     # Catch mouse event to disable button automatic change state pressed/unpressed
     def mousePressEvent(self, event: QMouseEvent):
@@ -98,191 +253,42 @@ class AnimatedButton(QPushButton):
 
     def start_disappearing(self):
         if self.animation_type == 'fade':
-            self.animate_fade()
+            self.animator.fade(self, self.animation_time)
         elif self.animation_type == 'shrink':
-            self.animate_shrink_centered()
-        elif self.animation_type == 'fly':      # don't use currently, need to repair the code
-            self.animate_fly()
-
-    def animate_fade(self):
-        # create transparent effect
-        effect = QGraphicsOpacityEffect(self)
-        self.setGraphicsEffect(effect)
-
-        # create animation based on opacity
-        self.anim = QPropertyAnimation(effect, b"opacity")
-        self.anim.setDuration(self.animation_time)
-        self.anim.setStartValue(1.0)    # fully visible
-        self.anim.setEndValue(0.0)      # hidden
-        self.anim.setEasingCurve(QEasingCurve.Type.InOutQuad)
-
-        self.anim.start()
-
-    def animate_shrink_centered(self):
-        # original X,Y
-        start_rect = self.geometry()
-
-        center_point = start_rect.center()
-
-        # End geometry, center position with zero size
-        end_rect = QRect(center_point.x(), center_point.y(), 0, 0)
-
-        # animate geometry (not size!)
-        self.anim = QPropertyAnimation(self, b"geometry")
-        self.anim.setDuration(self.animation_time)
-        self.anim.setStartValue(start_rect)
-        self.anim.setEndValue(end_rect)
-        self.anim.setEasingCurve(QEasingCurve.Type.InOutQuad)
-
-        # Use timer to avoid flicker in last frame
-        self.anim.finished.connect(lambda: QTimer.singleShot(0, self.set_permanent_transparent ))
-
-        self.anim.start()
+            self.animator.shrink(self, self.animation_time)
+        elif self.animation_type == 'fly':      # don't use currently
+            self.animator.fly(self, self.animation_time)
 
     def set_permanent_transparent(self):
-        # Create and setup 100% Transparency on button
-        effect = QGraphicsOpacityEffect(self)
-        effect.setOpacity(0.0)
-        self.setGraphicsEffect(effect)
-
-    def animate_fly(self):
-        # fly up and fade
-        effect = QGraphicsOpacityEffect(self)
-        self.setGraphicsEffect(effect)
-
-        self.anim_fade = QPropertyAnimation(effect, b"opacity")
-        self.anim_fade.setDuration(self.animation_time)
-        self.anim_fade.setStartValue(1.0)
-        self.anim_fade.setEndValue(0.0)
-
-        self.anim_pos = QPropertyAnimation(self, b"pos")
-        self.anim_pos.setDuration(self.animation_time)
-        self.anim_pos.setStartValue(self.pos())
-        self.anim_pos.setEndValue(self.pos() - QPoint(0, 50))   # 50 px up
-
-        self.anim_fade.finished.connect(self.hide)
-
-        self.anim_fade.start()
-        self.anim_pos.start()
-
-
-    # Threshold for alpha in animation to finish it.
-    # this is the only way I found to avoid last frame 100% opacity flash
-    # below the threshold animation is finished
-    ALPHA_THRESHOLD = 15
-
-    def _generate_flash_style(self, color):
-
-        # Cut animation when threshold is achieved
-        a = color.alpha()
-
-        if a <= self.ALPHA_THRESHOLD:
-            if self.color_anim.state() == self.color_anim.State.Running:
-                self.force_finish_flash()
-                return ""
-
-        # Generate CSS in current frame
-        r, g, b, a = color.red(), color.green(), color.blue(), color.alpha()
-
-        # I remove hover, to disable it during animation
-        background_style = f"background-color: rgba({r}, {g}, {b}, {a});"
-
-        # Original Style + dynamic background
-        qpushbutton_style = f"QPushButton {{ {self.base_css} {background_style} }}"
-
-        # chcked style must be setup if button is in setChecked
-        checked_style = f"""
-            QPushButton:checked {{
-                background-color: #55aaff; 
-                border: 2px solid white; 
-            }}
-        """
-
-        return qpushbutton_style + checked_style
+        # 100% Transparency on button, it still keeps its place in grid
+        self.animator.stop(self, "opacity")
+        self.opacity = 0.0
+        self.update()
 
     def flash_color_overlay(self, color_name="red"):
-        base_color = QColor(color_name)
-
-        start_color = QColor(base_color)
-        start_color.setAlpha(255)
-
-        end_color = QColor(base_color)
-        end_color.setAlpha(0)
-
-        # setup 100% color
-        self.update_overlay_color(start_color)
-
-        # create and run fade animation (from 255 to 0 alpha)
-        self.color_anim = QVariantAnimation(self)
-        self.color_anim.setDuration(self.animation_time)
-        self.color_anim.setStartValue(start_color)
-        self.color_anim.setEndValue(end_color)
-        self.color_anim.setEasingCurve(QEasingCurve.Type.OutQuad)
-
-        try:
-            self.color_anim.finished.disconnect()
-        except TypeError:
-            pass
-
-        ### Poniżej kod wywalenia hover podczas animacji
-
-        # First frame of Flash
-        self.setStyleSheet(self._generate_flash_style(start_color))
-
-        # connect to fade method
-        self.color_anim.valueChanged.connect(lambda color: self.setStyleSheet(self._generate_flash_style(color)))
-
-        self.color_anim.start()
-
-    # When fade reach alpha_threshold, this method kill animation before it's normally finish
-    # to avoid last frame 100% opacity flash
-    def force_finish_flash(self):
-
-        # Stop Animation
-        if self.color_anim and self.color_anim.state() == QVariantAnimation.State.Running:
-            self.color_anim.stop()
-
-        # Clear CSS
-        QTimer.singleShot(0, self.restore_default_style)
+        # Full color at once, then fade out alpha (255 -> 0)
+        self._overlay_color = QColor(color_name)
+        self.animator.flash(self, self.animation_time)
 
     def force_disable_instant(self, color_name="red"):
         # Stop Animation
-        if self.color_anim and self.color_anim.state() == QVariantAnimation.State.Running:
-            self.color_anim.stop()
+        self.animator.stop(self, "overlay_alpha")
 
         self.setEnabled(False)
 
         self.update_overlay_color(QColor(color_name))
 
     def update_overlay_color(self, color):
-        r, g, b, a = color.red(), color.green(), color.blue(), color.alpha()
-
-        ALPHA_THRESHOLD = 15
-        if a <= ALPHA_THRESHOLD and self.color_anim.state() == self.color_anim.State.Running:
-            self.force_finish_flash()
-            return
-
-        dynamic_style = f"""
-            QPushButton {{ 
-                {self.base_css} 
-                background-color: rgba({r}, {g}, {b}, {a}); 
-            }}
-
-            /* Keep static :hover and :pressed without changes! */
-            QPushButton:hover {{
-                border-color: yellow;
-                background-color: rgba(100, 100, 100, 50);
-            }}
-            QPushButton:pressed {{
-                background-color: rgba(50, 50, 50, 255);
-                border-style: inset;
-            }}
-        """
-
-        self.setStyleSheet(dynamic_style)
+        self.animator.stop(self, "overlay_alpha")
+        self._overlay_color = QColor(color)
+        self.overlay_alpha = float(self._overlay_color.alpha())
+        self.update()
 
     def restore_default_style(self):
-        self.setStyleSheet(self.full_static_style)
+        # Remove overlay, stylesheet stays untouched
+        self.animator.stop(self, "overlay_alpha")
+        self.overlay_alpha = 0.0
+        self.update()
 
 
 class MainWindow(QWidget):
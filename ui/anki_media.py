@@ -1,28 +1,16 @@
-from aqt.sound import play, av_player
-from typing import List
+from functools import lru_cache
 import re
 
 # Regex pattern to extract filename from [sound:filename.mp3]
 SOUND_TAG_REGEX = r"\[sound:(.*?)\]"
 
 
-def play_sound_from_media_folder(filename: str) -> None:
-    # Plays a single audio file directly from the media collection folder.
-    if filename:
-        play(filename)
+@lru_cache(maxsize=4096)
+def sound_filenames(field_content: str) -> tuple[str, ...]:
+    # Files of all sound tags in the field content, parsed once per field (page load, match, replay)
+    return tuple(filename for filename in re.findall(SOUND_TAG_REGEX, field_content) if filename)
 
 
-def play_audio_from_card_field(field_content: str) -> List[str]:
-    # Extracts and plays all embedded audio files from the card field text.
-    played_files = []
-
-    # Find all sound tags in the field content
-    matches = re.findall(SOUND_TAG_REGEX, field_content)
-
-    for filename in matches:
-        if filename:
-            # The 'play' function automatically searches in collection.media
-            play(filename)
-            played_files.append(filename)
-
-    return played_files
\ No newline at end of file
+def page_sound_filenames(page_data) -> list[str]:
+    # Files of audio fields of one page, (vocab, meaning, audio, card id) rows
+    return [filename for _vocab, _meaning, audio, _cid in page_data for filename in sound_filenames(audio)]
@@ -0,0 +1,48 @@
+import os
+from collections import OrderedDict
+from typing import Iterable
+
+from aqt import mw
+
+# Files already warmed by this game, not read again
+WARMED_FILES = 512
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def warm_files(paths: list[str]) -> None:
+    # Bring files into OS page cache, runs in background thread
+    for path in paths:
+        try:
+            with open(path, "rb") as file:
+                if hasattr(os, "posix_fadvise"):
+                    # Asynchronous read-ahead of whole file
+                    os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                    continue
+                while file.read(READ_BLOCK_SIZE):
+                    pass
+        except OSError:
+            pass
+
+
+class AudioPreloader:
+    # Sound files of the current and next page are read from disk in background when pages are loaded,
+    # so audio played as match feedback doesn't wait for the disk on first playback.
+
+    def __init__(self):
+        self._warmed: OrderedDict[str, None] = OrderedDict()
+
+    def preload(self, filenames: Iterable[str]) -> None:
+        media_dir = mw.col.media.dir()
+        paths = []
+        for filename in filenames:
+            path = os.path.join(media_dir, os.path.basename(filename))
+            if path in self._warmed:
+                continue
+            self._warmed[path] = None
+            paths.append(path)
+
+        while len(self._warmed) > WARMED_FILES:
+            self._warmed.popitem(last=False)
+
+        if paths:
+            mw.taskman.run_in_background(lambda: warm_files(paths))
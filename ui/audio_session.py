@@ -0,0 +1,75 @@
+from typing import Sequence
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from anki.sound import AVTag, SoundOrVideoTag
+from aqt import gui_hooks
+from aqt.sound import av_player
+
+from . import anki_media
+
+
+class AudioSession(QObject):
+    # Sounds played by one game window.
+    # Tags this game queued are followed by identity: av_player_will_play reports which tag starts,
+    # so only the end of our own tag is counted. End of anything else Anki plays (or of the sound
+    # interrupted by our queue, whether it reports its end or not) is ignored.
+    # Hooks are registered for the window's life only.
+    file_finished = pyqtSignal()
+    finished = pyqtSignal()     # all files of the last queue were played (or the queue was replaced)
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._pending: list[AVTag] = []         # our tags not started yet
+        self._current: AVTag | None = None      # our tag playing now
+        self.closed = False
+        gui_hooks.av_player_will_play.append(self._on_will_play)
+        gui_hooks.av_player_did_end_playing.append(self._on_end_playing)
+
+    @property
+    def is_playing(self) -> bool:
+        return bool(self._pending) or self._current is not None
+
+    def play_field(self, field_content: str) -> list[str]:
+        # Play all sound tags of the field one after another, returns played file names
+        filenames = list(anki_media.sound_filenames(field_content))
+        self.play(filenames)
+        return filenames
+
+    def play(self, filenames: Sequence[str]) -> None:
+        if self.closed or not filenames:
+            return
+        # New queue replaces whatever is playing, end of the stopped sound isn't ours any more
+        self._pending = [SoundOrVideoTag(filename=filename) for filename in filenames]
+        self._current = None
+        av_player.play_tags(list(self._pending))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._pending = []
+        self._current = None
+        gui_hooks.av_player_will_play.remove(self._on_will_play)
+        gui_hooks.av_player_did_end_playing.remove(self._on_end_playing)
+
+    def _on_will_play(self, tag: AVTag) -> None:
+        for index, pending in enumerate(self._pending):
+            if pending is tag:
+                del self._pending[index]
+                self._current = tag
+                return
+
+        # Something else plays now: Anki (or another add-on) replaced our queue, it won't be played
+        if self.is_playing:
+            self._pending = []
+            self._current = None
+            self.finished.emit()
+
+    def _on_end_playing(self, _player) -> None:
+        if self._current is None:
+            return
+
+        self._current = None
+        self.file_finished.emit()
+        if not self._pending:
+            self.finished.emit()
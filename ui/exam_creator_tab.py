@@ -1,16 +1,21 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton,
     QComboBox, QMessageBox, QHBoxLayout, QSpinBox, QGridLayout, QDoubleSpinBox,
-    QCheckBox, QSlider, QStackedWidget, QSpacerItem, QTimeEdit
+    QCheckBox, QSlider, QStackedWidget, QSpacerItem, QTimeEdit, QProgressBar
 )
 from PyQt6.QtCore import QTime
 from aqt import mw
-from aqt.qt import Qt, QScreen, QApplication
-from .matching_ui import MatchingExam
-import random
+from aqt.qt import Qt, QScreen, QApplication, QTimer
+from aqt.operations import QueryOp
+from .game_launcher import open_game, show_preparation_error
+from .session_stats_view import SessionStatsView
 import anki.errors
 
+from ..cancellation import CancellationToken
+from ..deck_metadata import metadata_cache, note_types_for_deck
 from ..enums import TimekeepingMode
+from ..game_config import GameConfig, load_game_config, save_game_config
+from ..game_data import PreparationCancelled, SAMPLING_DIFFICULTY, SAMPLING_RANDOM, game_page_source, prepare_game_data
 from ..translation import tr
 
 
@@ -51,7 +56,14 @@ class ExamCreatorTab(QWidget):
         self.word_columns.setRange(2, 50)
         self.word_columns.setValue(4)
 
-        self.deck_selector.currentIndexChanged.connect(self.update_note_types)
+        # Note types are queried in background, debounced while deck selection changes
+        self.note_types_token: CancellationToken | None = None
+        self.note_types_debounce = QTimer(self)
+        self.note_types_debounce.setSingleShot(True)
+        self.note_types_debounce.setInterval(150)
+        self.note_types_debounce.timeout.connect(self.update_note_types)
+
+        self.deck_selector.currentIndexChanged.connect(self.schedule_note_types_update)
         self.note_type_selector.currentIndexChanged.connect(self.update_fields)
         layout.addWidget(QLabel(tr("config_select_deck")))
         layout.addWidget(self.deck_selector)
@@ -144,6 +156,10 @@ class ExamCreatorTab(QWidget):
         self.card_selection_mode.addItem(tr("config_card_selection_mode_2"), "ready_all")
         self.card_selection_mode.addItem(tr("config_card_selection_mode_3"), "daily_limit")
 
+        self.card_order = QComboBox()
+        self.card_order.addItem(tr("config_card_order_random"), SAMPLING_RANDOM)
+        self.card_order.addItem(tr("config_card_order_difficulty"), SAMPLING_DIFFICULTY)
+
         gridConfigDeck = QGridLayout()
         layout.addLayout(gridConfigDeck)
 
@@ -153,6 +169,9 @@ class ExamCreatorTab(QWidget):
         gridConfigDeck.addWidget(QLabel(tr("config_card_selection_mode")), 0, 1)
         gridConfigDeck.addWidget(self.card_selection_mode, 1, 1)
 
+        gridConfigDeck.addWidget(QLabel(tr("config_card_order")), 0, 2)
+        gridConfigDeck.addWidget(self.card_order, 1, 2)
+
 
         # Disappering Animation Type  |  Animation Time
         gridConfigAnimation = QGridLayout()
@@ -175,17 +194,82 @@ class ExamCreatorTab(QWidget):
         gridConfig.addWidget(QLabel(tr("config_number_of_columns")), 0, 1)
         gridConfig.addWidget(self.word_columns, 1, 1)
 
+        self.confusable_pages_checkbox = QCheckBox("")
+        self.confusable_pages_checkbox.setChecked(False)
+        gridConfig.addWidget(QLabel(tr("config_confusable_pages")), 0, 2)
+        gridConfig.addWidget(self.confusable_pages_checkbox, 1, 2)
+
         btn_layout = QHBoxLayout()
         self.start_button = QPushButton("Start test")
         self.start_button.clicked.connect(self.start_exam)
         btn_layout.addWidget(self.start_button)
+        self.statistics_button = QPushButton(tr("config_statistics"))
+        self.statistics_button.clicked.connect(self.show_statistics)
+        btn_layout.addWidget(self.statistics_button)
         self.exit_button = QPushButton("Exit")
-        self.exit_button.clicked.connect(lambda: (mw.matching_config_win.close(), setattr(mw, "matching_config_win", None)))
+        self.exit_button.clicked.connect(self.exit_config)
         btn_layout.addWidget(self.exit_button)
         layout.addLayout(btn_layout)
+
+        # Progress of game data preparation, visible only while preparing
+        self.preparation_token: CancellationToken | None = None
+        progress_layout = QHBoxLayout()
+        self.preparation_progress = QProgressBar()
+        self.preparation_progress.setRange(0, 100)
+        self.preparation_progress.setFormat(tr("config_preparing"))
+        progress_layout.addWidget(self.preparation_progress)
+        self.preparation_cancel_button = QPushButton(tr("config_cancel"))
+        self.preparation_cancel_button.clicked.connect(self.cancel_preparation)
+        progress_layout.addWidget(self.preparation_cancel_button)
+        layout.addLayout(progress_layout)
+        self.set_preparing(False)
         self.setLayout(layout)
+
+        # Settings of the last game; deck, note type and fields are selected when their lists are filled
+        self.saved_config = load_game_config()
+        self.apply_config(self.saved_config)
         self.load_decks()
 
+    def apply_config(self, config: GameConfig):
+        self.card_selection_mode.setCurrentIndex(max(0, min(config.card_selection_mode,
+                                                            self.card_selection_mode.count() - 1)))
+        self.card_order.setCurrentIndex(max(0, self.card_order.findData(config.card_order)))
+        self.confusable_pages_checkbox.setChecked(config.confusable_pages)
+        self.update_stats_checkbox.setChecked(config.update_stats)
+        self.word_count_box.setValue(config.cards_per_page)
+        self.word_columns.setValue(config.columns)
+        self.font_size_slider.setValue(config.font_size)
+        self.screen_x.setValue(config.screen_width)
+        self.screen_y.setValue(config.screen_height)
+        self.disappearing_type.setCurrentIndex(max(0, self.disappearing_type.findText(config.animation_type)))
+        self.disappearing_time.setValue(config.animation_time)
+        self.timekeeping.setCurrentIndex(max(0, min(config.timekeeping_mode, self.timekeeping.count() - 1)))
+        self.timekeeping_time_per_page.setTime(QTime.fromString(config.countdown_per_page, "hh:mm:ss"))
+        self.timekeeping_time_for_all_cards.setTime(QTime.fromString(config.countdown_for_all_cards, "hh:mm:ss"))
+
+    def current_config(self) -> GameConfig:
+        return GameConfig(
+            deck=self.deck_selector.currentText(),
+            note_type=self.note_type_selector.currentText(),
+            vocab_field=self.vocab_field_selector.currentText(),
+            meaning_field=self.meaning_field_selector.currentText(),
+            audio_field=self.audio_field_selector.currentText(),
+            card_selection_mode=self.card_selection_mode.currentIndex(),
+            card_order=self.card_order.currentData(),
+            confusable_pages=self.confusable_pages_checkbox.isChecked(),
+            update_stats=self.update_stats_checkbox.isChecked(),
+            cards_per_page=self.word_count_box.value(),
+            columns=self.word_columns.value(),
+            font_size=self.font_size_slider.value(),
+            screen_width=self.screen_x.value(),
+            screen_height=self.screen_y.value(),
+            animation_type=self.disappearing_type.currentText(),
+            animation_time=self.disappearing_time.value(),
+            timekeeping_mode=self.timekeeping_mode.value,
+            countdown_per_page=self.timekeeping_time_per_page.time().toString("hh:mm:ss"),
+            countdown_for_all_cards=self.timekeeping_time_for_all_cards.time().toString("hh:mm:ss"),
+        )
+
     def timekeeping_config_changed(self, index: int) -> None:
         self.timekeeping_stacked.setCurrentIndex(index)
         self.timekeeping_mode = TimekeepingMode(index)
@@ -223,217 +307,179 @@ class ExamCreatorTab(QWidget):
 
     def load_decks(self):
         self.deck_selector.clear()
-        decks = mw.col.decks.all_names_and_ids()
-        for deck in decks:
-            self.deck_selector.addItem(deck.name, deck.id)
+        for name, did in metadata_cache.get_decks(mw.col):
+            self.deck_selector.addItem(name, did)
+        saved_deck = self.deck_selector.findText(self.saved_config.deck)
+        if saved_deck >= 0:
+            self.deck_selector.setCurrentIndex(saved_deck)
+
+    def schedule_note_types_update(self):
+        # Cancel query for previously selected deck, its result is stale
+        if self.note_types_token:
+            self.note_types_token.cancel()
+            self.note_types_token = None
+        self.note_type_selector.clear()
+
+        # Cached deck is shown instantly
+        if self.deck_selector.currentData() in metadata_cache.note_types:
+            self.note_types_debounce.stop()
+            self.update_note_types()
+            return
+
+        # Deck combo can change many times per second (scrolling), wait until it settles
+        self.note_types_debounce.start()
 
     def update_note_types(self):
         self.note_type_selector.clear()
-        deck_name = self.deck_selector.currentText()
-        cids = mw.col.find_cards(f'deck:"{deck_name}"')
-        nids = list(set(mw.col.db.list("select nid from cards where id in %s" % str(tuple(cids))))) if cids else []
-        nt_ids = set()
-        if nids:
-            q = "select mid from notes where id in " + str(tuple(nids)) if len(nids) > 1 else f"select mid from notes where id = ({nids[0]})"
-            nt_ids = set(mw.col.db.list(q))
-        for ntid in nt_ids:
-            nt = mw.col.models.get(ntid)
-            if nt:
-                self.note_type_selector.addItem(nt["name"], ntid)
+
+        deck_id = self.deck_selector.currentData()
+        if deck_id is None:
+            return
+
+        # Deck already visited, no query needed
+        if deck_id in metadata_cache.note_types:
+            self._fill_note_types(metadata_cache.note_types[deck_id])
+            return
+
+        generation = metadata_cache.generation
+        token = CancellationToken()
+        self.note_types_token = token
+
+        def query(col):
+            # Skip work for decks user already scrolled past
+            if token.is_cancelled:
+                return None
+            return note_types_for_deck(col, deck_id)
+
+        QueryOp(
+            parent=self,
+            op=query,
+            success=lambda note_types: self._note_types_loaded(token, generation, deck_id, note_types),
+        ).run_in_background()
+
+    def _note_types_loaded(self, token: CancellationToken, generation: int, deck_id: int, note_types):
+        if note_types is None:
+            return
+        metadata_cache.store_note_types(generation, deck_id, note_types)
+        if token.is_cancelled:
+            return
+        self.note_types_token = None
+        self._fill_note_types(note_types)
+
+    def _fill_note_types(self, note_types):
+        for ntid, name in note_types:
+            self.note_type_selector.addItem(name, ntid)
+        if self.deck_selector.currentText() == self.saved_config.deck:
+            saved_note_type = self.note_type_selector.findText(self.saved_config.note_type)
+            if saved_note_type >= 0:
+                self.note_type_selector.setCurrentIndex(saved_note_type)
 
     def update_fields(self):
         self.vocab_field_selector.clear()
         self.meaning_field_selector.clear()
         self.audio_field_selector.clear()
         ntid = self.note_type_selector.currentData()
-        model = mw.col.models.get(ntid)
-        if model:
-            fields = [f["name"] for f in model["flds"]]
+        fields = metadata_cache.get_fields(mw.col, ntid) if ntid is not None else []
+        if fields:
             self.vocab_field_selector.addItems(fields)
             self.meaning_field_selector.addItems(fields)
             self.audio_field_selector.addItems(fields)
-            self.config_deduction()
-
-    def get_cards_for_mode(self, deck_name: str, mode_index: int) -> list[int]:
-        # Base query limiting to the selected deck
-        # We use quotes around deck name to handle spaces safely
-        base_query = f'deck:"{deck_name}"'
-
-        status_query = ""
-
-        if mode_index == 0:
-            # Mode: All cards
-            # No status filter needed, fetches entire deck (including suspended).
-            pass
-
-        elif mode_index == 1:
-            # Mode: All ready cards (No limits)
-            # FIX: Previously 'is:due' missed 'is:new' cards.
-            # Now we explicitly ask for New, Due (Review), and Learn queues.
-            status_query = "(is:new OR is:due OR is:learn)"
-
-        elif mode_index == 2:
-            # Mode: Scheduled pool (Daily limits)
-            # Delegates logic to the new helper function to apply per-deck limits
-            # based on card type priority (Learn > Due > New).
-            return self._get_limited_scheduled_cards(deck_name)
-
-        # Combine deck query with status query
-        full_query = f"{base_query} {status_query}".strip()
-
-        # Execute search in Anki collection
-        return mw.col.find_cards(full_query)
-
-    def _get_limited_scheduled_cards(self, deck_name: str) -> list[int]:
-        base_query = f'deck:"{deck_name}"'
-        did = mw.col.decks.id_for_name(deck_name)
-
-        # 1. Get Daily Limits
-        conf = mw.col.decks.config_dict_for_deck_id(did)
-        new_limit = conf['new']['perDay']
-        review_limit = conf['rev']['perDay']
-
-        # 2. Fetch Cards for all three queues (Learn, Due, New)
-        # We need card objects to get their 'queue' status and 'due' date for sorting.
-        # Fetching all ready cards first.
-        all_ready_ids = mw.col.find_cards(f'{base_query} (is:new OR is:due OR is:learn)')
-
-        # Map card ID to the actual Card object
-        all_cards = [mw.col.get_card(cid) for cid in all_ready_ids]
-
-        # 3. Separate cards into priority groups
-        learn_cards = []
-        due_cards = []
-        new_cards = []
-
-        for card in all_cards:
-            if card.queue == 1:  # Learn queue (Anki consts: 1)
-                learn_cards.append(card)
-            elif card.queue == 2:  # Review/Due queue (Anki consts: 2)
-                due_cards.append(card)
-            elif card.queue == 0:  # New queue (Anki consts: 0)
-                new_cards.append(card)
-
-        # 4. Sort within groups (Priority: Oldest first)
-        # - Learn: Sort by oldest step (card.due)
-        learn_cards.sort(key=lambda c: c.due)
-        # - Due: Sort by oldest due date (card.due)
-        due_cards.sort(key=lambda c: c.due)
-        # - New: Sort by date added or card.id (to ensure a consistent order)
-        new_cards.sort(key=lambda c: c.id)
-
-        # 5. Apply Limits (New and Due)
-        # Learn cards are typically NOT limited by daily review limits.
-
-        # New cards limit
-        limited_new = [c.id for c in new_cards[:new_limit]]
-
-        # Due cards limit
-        limited_due = [c.id for c in due_cards[:review_limit]]
-
-        # 6. Combine and prioritize (Learn first, then Due, then New)
-        final_ids = (
-                [c.id for c in learn_cards] +
-                limited_due +
-                limited_new
-        )
-
-        # This list may still contain duplicates if a card technically meets
-        # multiple criteria (e.g., a card in learning that is also marked as 'due'
-        # by some internal logic). We use a set for final deduplication.
-        return list(set(final_ids))
+            if self.note_type_selector.currentText() == self.saved_config.note_type:
+                self.restore_fields()
+            else:
+                self.config_deduction()
+
+    def restore_fields(self):
+        # Fields of the last game instead of guessed ones; guess is used for fields that don't exist anymore
+        self.config_deduction()
+        for selector, field in ((self.vocab_field_selector, self.saved_config.vocab_field),
+                                (self.meaning_field_selector, self.saved_config.meaning_field),
+                                (self.audio_field_selector, self.saved_config.audio_field)):
+            index = selector.findText(field)
+            if index >= 0:
+                selector.setCurrentIndex(index)
 
     def start_exam(self):
-        deck_name = self.deck_selector.currentText()
-        note_type_id_check = self.note_type_selector.currentText()
-        vocab_field = self.vocab_field_selector.currentText()
-        meaning_field = self.meaning_field_selector.currentText()
-        audio_field = self.audio_field_selector.currentText()
+        config = self.current_config()
 
         # default validation
-        if not deck_name or not note_type_id_check or not vocab_field or not meaning_field:
+        if not config.is_complete:
             QMessageBox.warning(self, "Missing information", "Please select all fields.")
             return
 
-        note_type_id = mw.col.models.by_name(note_type_id_check)['id']
-
-        timekeeping_time = QTime()
-        match self.timekeeping_mode:
-            case TimekeepingMode.COUNTDOWN_PER_PAGE:
-                timekeeping_time = self.timekeeping_time_per_page.time()
-            case TimekeepingMode.COUNTDOWN_FOR_ALL_CARDS:
-                timekeeping_time = self.timekeeping_time_for_all_cards.time()
-
-
-        # --- Card Filtering Integration ---
-        # Get selected card pool mode index (0: Scheduled, 1: Ready, 2: All)
-        mode_index = self.card_selection_mode.currentIndex()
-
-        # Fetch card IDs using the new encapsulated function
-        card_ids = self.get_cards_for_mode(deck_name, mode_index)
-
-        if not card_ids:
-            QMessageBox.information(self, "No Cards Found", "No cards found for the selected criteria.")
+        # Game is already being prepared
+        if self.preparation_token:
             return
-        # --- End of Filtering Integration ---
-
-         # Prepare data structure for the MatchingExam game
-        all_data = []
-
-        # NOTE: Using the newly fetched card_ids list
-        for cid in card_ids:
-            card = mw.col.get_card(cid)
-            note = card.note()
-
-            # Skip cards that do not match the selected Note Type
-            if note.mid != note_type_id:
-                continue
 
-            # Extract content from fields
-            vocab_content = note[vocab_field]
-            meaning_content = note[meaning_field]
-
-            # Use audio_field only if it was selected; otherwise, use empty string
-            audio_content = note[audio_field] if audio_field else ""
-
-            # Check if both required fields have content
-            if vocab_content and meaning_content:
-                # Store the data as a 4-element tuple: (vocab, meaning, audio, card_id)
-                all_data.append((vocab_content, meaning_content, audio_content, cid))
-
-        if not all_data:
-            QMessageBox.warning(self, "Empty Fields",
-                                "No cards found with content in the selected Vocab and Meaning fields.")
+        # Remembered for next config window and for "Replay last game"
+        save_game_config(config)
+        self.saved_config = config
+
+        note_type_id = mw.col.models.by_name(config.note_type)['id']
+        confusable_page_size = config.cards_per_page if config.confusable_pages else 0
+
+        # Mode query -> field extraction -> shuffle runs in background, game opens when data is ready
+        token = CancellationToken()
+        self.preparation_token = token
+        self.set_preparing(True)
+
+        def on_progress(percent: int) -> None:
+            mw.taskman.run_on_main(lambda: self.preparation_progress.setValue(percent))
+
+        QueryOp(
+            parent=self,
+            op=lambda col: prepare_game_data(
+                col,
+                deck_name=config.deck,
+                # Card pool mode index (0: All, 1: Ready, 2: Scheduled)
+                mode_index=config.card_selection_mode,
+                note_type_id=note_type_id,
+                vocab_field=config.vocab_field,
+                meaning_field=config.meaning_field,
+                audio_field=config.audio_field,
+                token=token,
+                on_progress=on_progress,
+                sampling=config.card_order,
+                confusable_page_size=confusable_page_size,
+            ),
+            success=lambda card_ids: self._game_data_ready(token, card_ids, note_type_id, config),
+        ).failure(lambda error: self._game_data_failed(token, error)).run_in_background()
+
+    def cancel_preparation(self):
+        if self.preparation_token:
+            self.preparation_token.cancel()
+        self.preparation_token = None
+        self.set_preparing(False)
+
+    def set_preparing(self, preparing: bool):
+        self.preparation_progress.setValue(0)
+        self.preparation_progress.setVisible(preparing)
+        self.preparation_cancel_button.setVisible(preparing)
+        self.start_button.setEnabled(not preparing)
+
+    def show_statistics(self):
+        self.statistics_view = SessionStatsView(self)
+        self.statistics_view.show()
+
+    def exit_config(self):
+        self.cancel_preparation()
+        mw.matching_config_win.close()
+        setattr(mw, "matching_config_win", None)
+
+    def _game_data_ready(self, token: CancellationToken, card_ids: list[int], note_type_id: int, config: GameConfig):
+        if token.is_cancelled:
             return
+        self.preparation_token = None
+        self.set_preparing(False)
 
-        # 3. Shuffle data and run the game
-        random.shuffle(all_data)
-
-
-        win = MatchingExam(
-            all_data=all_data,
-            page_size=self.word_count_box.value(),
-            columns=self.word_columns.value(),
-            anim=self.disappearing_type.currentText(),
-            animtime=self.disappearing_time.value(),
-            ###update_stats=update_stats,
-            update_stats=self.update_stats_checkbox.isChecked(),
-            font_size=self.font_size_slider.value(),
-            timekeeping_mode=self.timekeeping_mode,
-            timekeeping_time=timekeeping_time)
-
-        win.setMinimumSize(600, 500)
+        # Field content is loaded by MatchingExam page by page
+        page_source = game_page_source(mw.col, card_ids, config.cards_per_page, note_type_id,
+                                       config.vocab_field, config.meaning_field, config.audio_field)
+        open_game(page_source, config)
 
-        DEFAULT_SCREEN_WIDTH = self.screen_x.value()
-        DEFAULT_SCREEN_HEIGHT = self.screen_y.value()
-
-        app = mw.app
-        screen = app.primaryScreen()
-        available_rect = screen.availableGeometry()
-        max_screen_width = available_rect.width()
-        max_screen_height = available_rect.height()
-        final_width = min(DEFAULT_SCREEN_WIDTH, max_screen_width)
-        final_height = min(DEFAULT_SCREEN_HEIGHT, max_screen_height)
-        win.resize(final_width, final_height)
-
-        win.show()
+    def _game_data_failed(self, token: CancellationToken, error: Exception):
+        if token.is_cancelled or isinstance(error, PreparationCancelled):
+            return
+        self.preparation_token = None
+        self.set_preparing(False)
+        show_preparation_error(self, error)
@@ -0,0 +1,98 @@
+from PyQt6.QtCore import QTime
+from PyQt6.QtWidgets import QMessageBox, QWidget
+from aqt import mw
+from aqt.operations import QueryOp
+from aqt.utils import showWarning, tooltip
+
+from .matching_ui import MatchingExam
+from ..cancellation import CancellationToken
+from ..enums import TimekeepingMode
+from ..game_config import GameConfig, load_game_config
+from ..game_data import NoCardsFound, NoFieldContent, PreparationCancelled, game_page_source, prepare_game_data
+from ..page_source import PageSource
+from ..translation import tr
+
+
+def timekeeping_time(config: GameConfig) -> QTime:
+    match config.timekeeping:
+        case TimekeepingMode.COUNTDOWN_PER_PAGE:
+            return QTime.fromString(config.countdown_per_page, "hh:mm:ss")
+        case TimekeepingMode.COUNTDOWN_FOR_ALL_CARDS:
+            return QTime.fromString(config.countdown_for_all_cards, "hh:mm:ss")
+    return QTime()
+
+
+def open_game(page_source: PageSource, config: GameConfig) -> MatchingExam:
+    # One game at a time; previous window is closed properly (grading, session log) before it's replaced
+    previous = getattr(mw, "matching_game_win", None)
+    if previous is not None:
+        previous.close()
+
+    win = MatchingExam(
+        page_source=page_source,
+        columns=config.columns,
+        anim=config.animation_type,
+        animtime=config.animation_time,
+        update_stats=config.update_stats,
+        font_size=config.font_size,
+        timekeeping_mode=config.timekeeping,
+        timekeeping_time=timekeeping_time(config))
+
+    win.setMinimumSize(600, 500)
+
+    app = mw.app
+    screen = app.primaryScreen()
+    available_rect = screen.availableGeometry()
+    max_screen_width = available_rect.width()
+    max_screen_height = available_rect.height()
+    final_width = min(config.screen_width, max_screen_width)
+    final_height = min(config.screen_height, max_screen_height)
+    win.resize(final_width, final_height)
+
+    # Game window has no parent, this reference keeps it alive
+    mw.matching_game_win = win
+    win.show()
+    return win
+
+
+def show_preparation_error(parent: QWidget, error: Exception) -> None:
+    if isinstance(error, NoCardsFound):
+        QMessageBox.information(parent, "No Cards Found", "No cards found for the selected criteria.")
+    elif isinstance(error, NoFieldContent):
+        QMessageBox.warning(parent, "Empty Fields",
+                            "No cards found with content in the selected Vocab and Meaning fields.")
+    elif not isinstance(error, PreparationCancelled):
+        showWarning(f"Failed to prepare cards: {error}")
+
+
+def replay_last_game(on_missing_config) -> None:
+    # Start game with last saved settings, without config window.
+    # on_missing_config is called when there is nothing (valid) to replay.
+    config = load_game_config()
+    model = mw.col.models.by_name(config.note_type) if config.is_complete else None
+    if not model:
+        on_missing_config()
+        return
+
+    note_type_id = model["id"]
+    tooltip(tr("replay_preparing"))
+
+    QueryOp(
+        parent=mw,
+        op=lambda col: prepare_game_data(
+            col,
+            deck_name=config.deck,
+            mode_index=config.card_selection_mode,
+            note_type_id=note_type_id,
+            vocab_field=config.vocab_field,
+            meaning_field=config.meaning_field,
+            audio_field=config.audio_field,
+            token=CancellationToken(),
+            sampling=config.card_order,
+            confusable_page_size=config.cards_per_page if config.confusable_pages else 0,
+        ),
+        success=lambda card_ids: open_game(
+            game_page_source(mw.col, card_ids, config.cards_per_page, note_type_id,
+                             config.vocab_field, config.meaning_field, config.audio_field),
+            config),
+    ).failure(lambda error: show_preparation_error(mw, error)).run_in_background()
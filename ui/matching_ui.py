@@ -5,26 +5,34 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTime
 from PyQt6.QtGui import QFont, QColor
 import random
+import time
+from array import array
+from .tile_animator import TileAnimator
+from .tile_pool import TilePool
 from .animated_button import AnimatedButton
-from aqt import gui_hooks
-from aqt.utils import showWarning
+from .audio_preloader import AudioPreloader
+from .audio_session import AudioSession
+from .thumbnail_cache import thumbnail_cache
+from .tile_layout import TILE_IMAGE_SIZE, PageLayout, max_column_width, plan_page_layout, text_metrics
 from aqt.qt import QTimer
-from aqt.sound import av_player
 
 from . import anki_media
-from ..grade_now import grade_now
+from ..grading_queue import GradingQueue
 from ..translation import tr
 from ..clockdown_manager import ClockdownManager
 from ..timer_manager import TimerManager
-from ..enums import TimekeepingMode
+from ..enums import SessionEvent, TimekeepingMode
+from ..field_text import ImageField
+from ..page_source import PageSource
+from ..session_recorder import SessionRecorder
 
 
 class MatchingExam(QWidget):
-    def __init__(self, all_data, page_size=5, columns=3, anim="fade", animtime=0.5, update_stats=False, font_size=18, timekeeping_mode=TimekeepingMode.TIME_INFORMATIONAL, timekeeping_time=QTime()):
+    def __init__(self, page_source: PageSource, columns=3, anim="fade", animtime=0.5, update_stats=False, font_size=18, timekeeping_mode=TimekeepingMode.TIME_INFORMATIONAL, timekeeping_time=QTime()):
         super().__init__()
         self.setWindowTitle(tr("window_title_game"))
-        self.all_data = all_data
-        self.page_size = page_size
+        self.page_source = page_source
+        self.page_size = page_source.page_size
         self.columns = columns
         self.anim = anim
         self.animtime = animtime
@@ -36,10 +44,13 @@ class MatchingExam(QWidget):
         self.correct_total = 0
         self.wrong_total = 0
         self.matched_pairs = set()
-        self.selected_vocab = None
-        self.selected_meaning = None
-        self.vocab_buttons = {}
-        self.meaning_buttons = {}
+        self.grading_queue = GradingQueue(self, ease=2)
+        self.recorder = SessionRecorder()
+        self.audio_preloader = AudioPreloader()
+        # Page model, see load_page: tiles are ids (card index * 2 + side), selection holds tile ids
+        self.selected_vocab: int | None = None
+        self.selected_meaning: int | None = None
+        self.tiles: list[AnimatedButton] = []
         self.init_ui()
 
     def init_ui(self):
@@ -164,6 +175,12 @@ class MatchingExam(QWidget):
         # Grid start
         self.grid = QGridLayout()
         self.layout.addLayout(self.grid)
+        # One animation driver for all tiles of the page
+        self.tile_animator = TileAnimator(self)
+        self.tile_pool = TilePool(self, self.anim, self.animtime, self.font_size, self.tile_animator)
+        self.text_metrics = text_metrics(self.font_size)
+        # (grid slot, text) of current page tiles, layout is planned again when window width changes
+        self.page_slot_texts: list[tuple[int, str]] = []
 
         # Display Current Status Text
         self.status_label = QLabel("Select a word and a meaning to match.")
@@ -229,10 +246,13 @@ class MatchingExam(QWidget):
         """)
 
         self.audio_currently_playing = False
-        gui_hooks.av_player_did_end_playing.append(self._handle_audio_finished)
+        # Sounds of this game only; its hook is removed when window closes
+        self.audio_session = AudioSession(self)
+        self.audio_session.file_finished.connect(lambda: self.recorder.record(SessionEvent.AUDIO_FINISHED))
+        self.audio_session.finished.connect(self._handle_audio_finished)
         self.last_sound: str | None = None
 
-        self.total_pages : int = (len(self.all_data) + self.page_size - 1) // self.page_size
+        self.total_pages : int = self.page_source.total_pages
 
         self.layout.addLayout(button_layout)
         self.load_page()
@@ -252,9 +272,7 @@ class MatchingExam(QWidget):
 
     def clockdown_finish_per_page(self):
         # Disable this page buttons
-        for btn in self.vocab_buttons.values():
-            btn.force_disable_instant("lightcoral")
-        for btn in self.meaning_buttons.values():
+        for btn in self.tiles:
             btn.force_disable_instant("lightcoral")
         # Disable Timer for all cards, only if this is last page
         if self.is_last_page():
@@ -262,9 +280,7 @@ class MatchingExam(QWidget):
 
     def clockdown_finish_for_all_cards(self):
         # Disable this page buttons
-        for btn in self.vocab_buttons.values():
-            btn.force_disable_instant("lightcoral")
-        for btn in self.meaning_buttons.values():
+        for btn in self.tiles:
             btn.force_disable_instant("lightcoral")
         # Disable "Next Page" button
         self.next_button.setStyleSheet("""
@@ -279,7 +295,7 @@ class MatchingExam(QWidget):
         self.timer_manager_per_page.stop_timer()
 
     def load_page(self):
-        #total_pages = (len(self.all_data) + self.page_size - 1) // self.page_size
+        page_build_start = time.monotonic_ns()
         self.page_info.setText(tr("game_page", page=self.current_page+1, total_pages=self.total_pages))
 
         self.can_auto_next_page = False
@@ -300,93 +316,106 @@ class MatchingExam(QWidget):
         if self.is_last_page():
             self.next_button.setVisible(False)
 
+        # Grade cards matched on previous page
+        self.grading_queue.flush()
+
         self.clear_grid()
         self.selected_vocab = None
         self.selected_meaning = None
-        self.vocab_buttons = {}
-        self.meaning_buttons = {}
-        start = self.current_page * self.page_size
-        end = start + self.page_size
-        self.page_data = self.all_data[start:end]
+        self.tiles = []
+        self.page_data = self.page_source.page(self.current_page)
         if not self.page_data:
             QMessageBox.information(self, "No data left", "No more pairs to display.")
             return
 
-        # Get number of current page cards (tiles = cards * 2)
-        self.current_page_cards = len(self.page_data)
-
-
-        tiles_number = self.page_size * 2
-        tiles = random.sample(range(0, tiles_number), tiles_number)
-
-        self.correct_pairs = {v: (m, audio, cid) for v, m, audio, cid in self.page_data}
-        vocabs = [v for v, m, audio, cid in self.page_data]
-        meanings = [m for v, m, audio, cid in self.page_data]
-        random.shuffle(vocabs)
-        random.shuffle(meanings)
-
-        tile_pos = 0
-        tile_rand = 0
-
-        for i, vocab in enumerate(vocabs):
-            btn = AnimatedButton(vocab, self.anim, self.animtime, self.font_size)
-            btn.clicked.connect(lambda _, v=vocab: self.select_vocab(v))
-            self.vocab_buttons[vocab] = btn
-            tile_rand = tiles[tile_pos]
-            col = tile_rand % self.columns
-            row = tile_rand // self.columns
-            tile_pos += 1
-            self.grid.addWidget(btn, row, col)
-
-        for i, meaning in enumerate(meanings):
-            btn = AnimatedButton(meaning, self.anim, self.animtime, self.font_size)
-            btn.clicked.connect(lambda _, m=meaning: self.select_meaning(m))
-            self.meaning_buttons[meaning] = btn
-            tile_rand = tiles[tile_pos]
-            col = tile_rand % self.columns
-            row = tile_rand // self.columns
-            tile_pos += 1
-            self.grid.addWidget(btn, row, col)
-
-        max_tile_width = self.find_max_button_width(self.grid)
-        self.set_uniform_column_width(self.grid, max_tile_width, self.columns)
-
-
-    def find_max_button_width(self, grid_layout):
-        max_width = 0
+        # Sound files of this page are read from disk in background, before the first match
+        self.audio_preloader.preload(anki_media.page_sound_filenames(self.page_data))
 
-        # All grid elements
-        for i in range(grid_layout.count()):
-            item = grid_layout.itemAt(i)
+        # Load next page(s) when event loop is idle, after this page is displayed
+        QTimer.singleShot(0, lambda page=self.current_page: self.prefetch_next_page(page))
 
-            # If the grid element is widget (button)...
-            if item and item.widget():
-                widget = item.widget()
-
-                # Enforce size based on text
-                width = widget.sizeHint().width()
-
-                if width > max_width:
-                    max_width = width
-
-        return max_width
-
-    def set_uniform_column_width(self, grid_layout, max_width, num_columns):
-        # Add a little padding to text
-        target_width = max_width + 10
-
-        # Setup minimum width for every column
-        for col in range(num_columns):
-            grid_layout.setColumnMinimumWidth(col, target_width)
+        # Get number of current page cards (tiles = cards * 2)
+        self.current_page_cards = len(self.page_data)
 
-            # setting Stretch to 0, keep column no extending, keeping them on minimum width
-            grid_layout.setColumnStretch(col, 0)
+        # Page model: tile id = card index * 2 + side (0 vocab, 1 meaning).
+        # tile_card / tile_side / tile_slot are indexed by tile id, every tile gets a random grid slot.
+        tiles_number = self.current_page_cards * 2
+        self.tile_card = array("H", (tile >> 1 for tile in range(tiles_number)))
+        self.tile_side = array("B", (tile & 1 for tile in range(tiles_number)))
+        self.tile_slot = array("H", random.sample(range(0, self.page_size * 2), tiles_number))
+
+        # Cards with the same vocab (or meaning) text on one page can't be told apart by the player,
+        # each card points to the first card with its text; a match is checked on these indexes
+        self.vocab_group = self.text_groups([vocab for vocab, _m, _audio, _cid in self.page_data])
+        self.meaning_group = self.text_groups([meaning for _v, meaning, _audio, _cid in self.page_data])
+        self.card_matched = bytearray(self.current_page_cards)
+
+        tile_texts = [self.page_data[self.tile_card[tile]][self.tile_side[tile]] for tile in range(tiles_number)]
+
+        # Grid geometry is planned from text metrics before tiles are placed, so tiles are laid out once
+        self.page_slot_texts = list(zip(self.tile_slot, tile_texts))
+        self.apply_page_layout(self.plan_layout())
+
+        for tile, text in enumerate(tile_texts):
+            btn = self.tile_pool.acquire(text)
+            btn.card_id = self.page_data[self.tile_card[tile]][3]
+            btn.side = self.tile_side[tile]
+            if btn.side == 0:
+                btn.clicked.connect(lambda _, t=tile: self.select_vocab(t))
+            else:
+                btn.clicked.connect(lambda _, t=tile: self.select_meaning(t))
+            self.tiles.append(btn)
+            slot = self.tile_slot[tile]
+            self.grid.addWidget(btn, slot // self.columns, slot % self.columns)
+            btn.show()
+
+        page_build_us = (time.monotonic_ns() - page_build_start) // 1000
+        self.recorder.record(SessionEvent.PAGE_LOADED, self.current_page, page_build_us)
+
+
+    @staticmethod
+    def text_groups(texts: list[str]) -> array:
+        # Index of the first card with the same text, for every card of the page
+        first = {}
+        return array("H", (first.setdefault(text, index) for index, text in enumerate(texts)))
+
+    def prefetch_next_page(self, page: int):
+        self.page_source.prefetch(page)
+
+        # Pictures of next page are decoded in background while this page is played
+        next_page_data = self.page_source.peek(page + 1)
+        if next_page_data:
+            self.audio_preloader.preload(anki_media.page_sound_filenames(next_page_data))
+            images = [text for row in next_page_data for text in row[:2] if isinstance(text, ImageField)]
+            if images:
+                thumbnail_cache().prefetch(images, TILE_IMAGE_SIZE)
+
+    def plan_layout(self) -> PageLayout:
+        # Columns share window width, long texts wrap instead of widening the window
+        margins = self.layout.contentsMargins()
+        grid_width = self.width() - margins.left() - margins.right()
+        column_limit = max_column_width(grid_width, self.grid.horizontalSpacing(), self.columns)
+        return plan_page_layout(self.text_metrics, self.page_slot_texts, self.columns, column_limit)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.page_slot_texts and event.size().width() != event.oldSize().width():
+            self.apply_page_layout(self.plan_layout())
+
+    def apply_page_layout(self, page_layout: PageLayout):
+        # Same minimum width for every column; setting Stretch to 0 keeps columns on minimum width
+        for col in range(self.columns):
+            self.grid.setColumnMinimumWidth(col, page_layout.column_width)
+            self.grid.setColumnStretch(col, 0)
+
+        # Rows of previous (bigger) page are released
+        for row in range(max(self.grid.rowCount(), len(page_layout.row_heights))):
+            height = page_layout.row_heights[row] if row < len(page_layout.row_heights) else 0
+            self.grid.setRowMinimumHeight(row, height)
 
     def clear_grid(self):
-        while self.grid.count():
-            child = self.grid.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        # Tiles go back to the pool, they are reused on next page
+        self.tile_pool.release_grid(self.grid)
 
     def next_page(self):
         self.current_page += 1
@@ -401,62 +430,81 @@ class MatchingExam(QWidget):
         self.summary_wrong.setText(f"❌ Wrong: {self.wrong_total}")
         self.summary_accuracy.setText(f"🎯 Accuracy: {accuracy}%")
 
-    def select_vocab(self, vocab):
-        #if self.selected_vocab == vocab:
-        if self.selected_vocab != None and self.vocab_buttons[vocab].isChecked():
-            self.vocab_buttons[self.selected_vocab].setChecked(False)  # Unselect Button
+    def select_vocab(self, tile: int):
+        #if self.selected_vocab == tile:
+        if self.selected_vocab is not None and self.tiles[tile].isChecked():
+            self.tiles[self.selected_vocab].setChecked(False)  # Unselect Button
             self.selected_vocab = None
             return
 
-        if self.selected_vocab != None:
-            self.selection_wrong(self.vocab_buttons[self.selected_vocab], self.vocab_buttons[vocab])
+        if self.selected_vocab is not None:
+            self.selection_wrong(self.tiles[self.selected_vocab], self.tiles[tile])
             return
 
-        self.selected_vocab = vocab
-        self.status_label.setText(f"Selected word: {vocab}")
+        self.selected_vocab = tile
+        self.status_label.setText(f"Selected word: {self.tiles[tile].text()}")
+        self.recorder.record(SessionEvent.SELECT_VOCAB, self.tiles[tile].card_id)
 
-        self.vocab_buttons[self.selected_vocab].setChecked(True)    # Select Button
+        self.tiles[self.selected_vocab].setChecked(True)    # Select Button
 
         self.check_match()
 
-    def select_meaning(self, meaning):
-        #if self.selected_meaning == meaning:
-        if self.selected_meaning != None and self.meaning_buttons[meaning].isChecked():
-            self.meaning_buttons[self.selected_meaning].setChecked(False)  # Unselect Button
+    def select_meaning(self, tile: int):
+        #if self.selected_meaning == tile:
+        if self.selected_meaning is not None and self.tiles[tile].isChecked():
+            self.tiles[self.selected_meaning].setChecked(False)  # Unselect Button
             self.selected_meaning = None
             return
 
-        if self.selected_meaning != None:
-            self.selection_wrong(self.meaning_buttons[self.selected_meaning], self.meaning_buttons[meaning])
+        if self.selected_meaning is not None:
+            self.selection_wrong(self.tiles[self.selected_meaning], self.tiles[tile])
             return
 
 
-        self.selected_meaning = meaning
-        self.status_label.setText(f"Selected meaning: {meaning}")
+        self.selected_meaning = tile
+        self.status_label.setText(f"Selected meaning: {self.tiles[tile].text()}")
+        self.recorder.record(SessionEvent.SELECT_MEANING, self.tiles[tile].card_id)
 
-        self.meaning_buttons[self.selected_meaning].setChecked(True)   # Select Button
+        self.tiles[self.selected_meaning].setChecked(True)   # Select Button
 
         self.check_match()
 
+    def matched_card(self, vocab_tile: int, meaning_tile: int) -> int | None:
+        # Pair is correct when a not yet matched card of the page has exactly these two texts
+        # (vocab group, meaning group); that card is matched, not necessarily the card of either tile.
+        # Remaining tiles then always show the texts of remaining cards, the page can be finished.
+        vocab_card = self.tile_card[vocab_tile]
+        meaning_card = self.tile_card[meaning_tile]
+        wanted = (self.vocab_group[vocab_card], self.meaning_group[meaning_card])
+        # Own card of the vocab / meaning tile first
+        for card in (vocab_card, meaning_card, *range(len(self.page_data))):
+            if not self.card_matched[card] and (self.vocab_group[card], self.meaning_group[card]) == wanted:
+                return card
+        return None
+
     def check_match(self):
-        if self.selected_vocab and self.selected_meaning:
-            # correct_meaning has meaning and cid
-            correct_meaning, audio_content, card_id = self.correct_pairs.get(self.selected_vocab)
-            #correct_meaning = self.correct_pairs.get(self.selected_vocab)
-            if correct_meaning == self.selected_meaning:
-                self.vocab_buttons[self.selected_vocab].setStyleSheet("background-color: lightgreen;")
-                self.meaning_buttons[self.selected_meaning].setStyleSheet("background-color: lightgreen;")
-                self.vocab_buttons[self.selected_vocab].setEnabled(False)
-                self.meaning_buttons[self.selected_meaning].setEnabled(False)
+        if self.selected_vocab is not None and self.selected_meaning is not None:
+            vocab_btn = self.tiles[self.selected_vocab]
+            meaning_btn = self.tiles[self.selected_meaning]
+            card = self.matched_card(self.selected_vocab, self.selected_meaning)
+            if card is not None:
+                # Matched card gives audio and grade
+                self.card_matched[card] = 1
+                _vocab, _meaning, audio_content, card_id = self.page_data[card]
+                vocab_btn.update_overlay_color(QColor("lightgreen"))
+                meaning_btn.update_overlay_color(QColor("lightgreen"))
+                vocab_btn.setEnabled(False)
+                meaning_btn.setEnabled(False)
                 self.correct_total += 1
                 self.status_label.setText("✅ Correct!")
-                self.vocab_buttons[self.selected_vocab].start_disappearing()
-                self.meaning_buttons[self.selected_meaning].start_disappearing()
+                self.recorder.record(SessionEvent.MATCH, card_id)
+                vocab_btn.start_disappearing()
+                meaning_btn.start_disappearing()
 
                 self._update_card_progress(card_id)
 
-                self.vocab_buttons[self.selected_vocab].setChecked(False)       # Unselect Button
-                self.meaning_buttons[self.selected_meaning].setChecked(False)   # Unselect Button
+                vocab_btn.setChecked(False)       # Unselect Button
+                meaning_btn.setChecked(False)   # Unselect Button
 
                 self.update_summary()
 
@@ -464,8 +512,9 @@ class MatchingExam(QWidget):
 
                 # play audio file if exist
                 self.last_sound : str = audio_content
-                played_files = anki_media.play_audio_from_card_field(audio_content)
+                played_files = self.audio_session.play_field(audio_content)
                 if len(played_files) > 0:
+                    self.recorder.record(SessionEvent.AUDIO_STARTED, card_id)
                     self.audio_currently_playing = True
                     self.corner_button_sound.setText("🔊")
 
@@ -475,7 +524,7 @@ class MatchingExam(QWidget):
                     self.matched_last_card_on_page()
 
             else:
-                self.selection_wrong(self.vocab_buttons[self.selected_vocab], self.meaning_buttons[self.selected_meaning])
+                self.selection_wrong(vocab_btn, meaning_btn)
 
             self.selected_vocab = None
             self.selected_meaning = None
@@ -483,6 +532,8 @@ class MatchingExam(QWidget):
     def selection_wrong(self, btn1, btn2):
         self.wrong_total += 1
         self.status_label.setText("❌ Wrong, try again!")
+        self.recorder.record(SessionEvent.MISTAKE, btn1.card_id, btn1.side)
+        self.recorder.record(SessionEvent.MISTAKE, btn2.card_id, btn2.side)
 
         btn1.setChecked(False)  # Unselect Button
         btn2.setChecked(False)  # Unselect Button
@@ -499,15 +550,17 @@ class MatchingExam(QWidget):
         if not self.update_stats:
             return
 
-        grade_now(parent=self, card_ids=[card_id], ease=2).failure(self._handle_update_failure).run_in_background()
-
-    def _handle_update_failure(self, error):
-        showWarning(f"Failed to update card status: {error}")
+        # Graded in batches: once per page, on timer or when window closes
+        self.grading_queue.add(card_id)
 
     # execute when last card on the page is matched
     def matched_last_card_on_page(self):
         QTimer.singleShot(int(self.animtime*1000), self._handle_last_animation_finished)
 
+        # Game finished, grade cards matched on last page
+        if self.is_last_page():
+            self.grading_queue.flush()
+
         # Timers and Countdowners
         if self.is_last_page():
             match self.timekeeping_mode:
@@ -534,22 +587,36 @@ class MatchingExam(QWidget):
         if self.audio_currently_playing == False and self.can_auto_next_page and not self.is_last_page():
             self.next_page()
 
-    # execute when single audio file finished
-    def _handle_audio_finished(self, audio_finished_filename: str) -> None:
-        files_remaining = len(av_player._enqueued)
-
-        if files_remaining <= 0:
-            self.audio_currently_playing = False
-            self.corner_button_sound.setText("🔈")
-            if self.last_animation_finished == True and self.can_auto_next_page and not self.is_last_page():
-                self.next_page()
+    # execute when all audio files queued by this game finished
+    def _handle_audio_finished(self) -> None:
+        self.audio_currently_playing = False
+        self.corner_button_sound.setText("🔈")
+        if self.last_animation_finished == True and self.can_auto_next_page and not self.is_last_page():
+            self.next_page()
 
     def corner_button_sound_clicked(self):
         if self.last_sound:
-            played_files = anki_media.play_audio_from_card_field(self.last_sound)
+            played_files = self.audio_session.play_field(self.last_sound)
             if len(played_files) > 0:
                 self.audio_currently_playing = True
                 self.corner_button_sound.setText("🔊")
 
+    def closeEvent(self, event):
+        self.tile_animator.stop_all()
+        self.stop_all_clocks()
+        self.grading_queue.close()
+        self.recorder.close()
+        self.audio_session.close()
+        super().closeEvent(event)
+
+    def stop_all_clocks(self):
+        # Unregister clocks of this window from shared ClockService
+        for name in ("timer_manager_per_page", "timer_manager_for_all_cards"):
+            if hasattr(self, name):
+                getattr(self, name).stop_timer()
+        for name in ("clockdown_manager_per_page", "clockdown_manager_for_all_cards"):
+            if hasattr(self, name):
+                getattr(self, name).stop_clockdown()
+
     def is_last_page(self):
         return self.current_page+1 >= self.total_pages
\ No newline at end of file
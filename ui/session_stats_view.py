@@ -0,0 +1,89 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QTabWidget, QHeaderView, QPushButton
+)
+from aqt.operations import QueryOp
+
+from ..card_loader import sort_field_texts
+from ..session_analytics import SessionAnalytics, CardStats, analyze, load_history
+from ..translation import tr
+
+
+class SessionStatsView(QDialog):
+    # Results of all recorded game sessions (opened from config window)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(tr("stats_window_title"))
+        self.resize(700, 500)
+
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel(tr("stats_loading"))
+        layout.addWidget(self.summary_label)
+
+        self.tabs = QTabWidget()
+        self.most_missed_table = self.create_table([tr("stats_card"), tr("stats_error_rate"), tr("stats_mistakes"), tr("stats_matches")])
+        self.slowest_table = self.create_table([tr("stats_card"), tr("stats_median_time"), tr("stats_matches")])
+        self.trend_table = self.create_table([tr("stats_month"), tr("stats_accuracy")])
+        self.tabs.addTab(self.most_missed_table, tr("stats_tab_most_missed"))
+        self.tabs.addTab(self.slowest_table, tr("stats_tab_slowest"))
+        self.tabs.addTab(self.trend_table, tr("stats_tab_accuracy_trend"))
+        layout.addWidget(self.tabs)
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button)
+
+        # Logs are read and aggregated in background
+        QueryOp(
+            parent=self,
+            op=self._compute,
+            success=self._show_results,
+        ).run_in_background()
+
+    def create_table(self, headers: list[str]) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    @staticmethod
+    def _compute(col) -> tuple[SessionAnalytics, dict[int, str]]:
+        result = analyze(load_history())
+        card_ids = [card.card_id for card in result.most_missed_cards + result.slowest_cards]
+        return result, sort_field_texts(col, card_ids)
+
+    def _show_results(self, computed: tuple[SessionAnalytics, dict[int, str]]) -> None:
+        result, card_texts = computed
+
+        self.summary_label.setText(tr(
+            "stats_summary",
+            sessions=result.sessions,
+            cards=len(result.cards),
+            matches=result.matches,
+            mistakes=result.mistakes // 2,
+        ))
+
+        def card_label(card: CardStats) -> str:
+            # Deleted cards are shown by id
+            return card_texts.get(card.card_id, f"#{card.card_id}")
+
+        self.fill_table(self.most_missed_table, [
+            (card_label(c), f"{c.error_rate * 100:.1f}%", str(c.mistakes), str(c.matches))
+            for c in result.most_missed_cards
+        ])
+        self.fill_table(self.slowest_table, [
+            (card_label(c), f"{c.median_match_ms / 1000:.2f} s", str(c.matches))
+            for c in result.slowest_cards
+        ])
+        self.fill_table(self.trend_table, [
+            (month, f"{accuracy}%") for month, accuracy in result.accuracy_by_month
+        ])
+
+    def fill_table(self, table: QTableWidget, rows: list[tuple[str, ...]]) -> None:
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                table.setItem(row, col, QTableWidgetItem(value))
@@ -0,0 +1,110 @@
+import os
+from collections import OrderedDict
+from typing import Iterable
+
+from PyQt6.QtCore import QObject, QRunnable, QSize, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from aqt import mw
+
+# Memory used by decoded thumbnails (RGBA, 4 bytes per pixel)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Decoding threads, Anki's own background work shouldn't wait for pictures
+DECODE_THREADS = 2
+
+
+class _DecodeSignals(QObject):
+    # Emitted from worker thread, delivered to the cache on main thread (queued connection)
+    decoded = pyqtSignal(object, object)    # key, QImage
+
+
+class _DecodeJob(QRunnable):
+    def __init__(self, key: tuple[str, int, int], path: str, signals: _DecodeSignals):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        # QImage (unlike QPixmap) may be used outside of the GUI thread
+        image = QImage(self.path)
+        if not image.isNull():
+            _filename, width, height = self.key
+            image = image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        self.signals.decoded.emit(self.key, image)
+
+
+class ThumbnailCache(QObject):
+    # Pictures of image tiles, decoded and scaled on worker threads.
+    # LRU bounded by memory, keyed by (file name, tile image width, height).
+    thumbnail_ready = pyqtSignal(object)    # key
+
+    def __init__(self, media_dir: str, parent: QObject | None = None):
+        super().__init__(parent)
+        self.media_dir = media_dir
+        self._pixmaps: OrderedDict[tuple[str, int, int], QPixmap] = OrderedDict()
+        self._bytes = 0
+        self._pending: set[tuple[str, int, int]] = set()
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(DECODE_THREADS)
+        self._signals = _DecodeSignals(self)
+        self._signals.decoded.connect(self._decoded)
+
+    @staticmethod
+    def key(filename: str, size: QSize) -> tuple[str, int, int]:
+        return str(filename), size.width(), size.height()
+
+    def get(self, filename: str, size: QSize) -> QPixmap | None:
+        # Cached thumbnail (null pixmap when file can't be read), None while it's being decoded
+        key = self.key(filename, size)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        self._decode(key)
+        return None
+
+    def prefetch(self, filenames: Iterable[str], size: QSize) -> None:
+        for filename in filenames:
+            key = self.key(filename, size)
+            if key not in self._pixmaps:
+                self._decode(key)
+
+    def clear(self) -> None:
+        self._pool.clear()
+        self._pixmaps.clear()
+        self._bytes = 0
+
+    def _decode(self, key: tuple[str, int, int]) -> None:
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        self._pool.start(_DecodeJob(key, os.path.join(self.media_dir, key[0]), self._signals))
+
+    def _decoded(self, key: tuple[str, int, int], image: QImage) -> None:
+        self._pending.discard(key)
+
+        pixmap = QPixmap.fromImage(image)
+        self._pixmaps[key] = pixmap
+        self._bytes += pixmap.width() * pixmap.height() * 4
+        while self._bytes > MAX_CACHE_BYTES and len(self._pixmaps) > 1:
+            _key, old = self._pixmaps.popitem(last=False)
+            self._bytes -= old.width() * old.height() * 4
+
+        self.thumbnail_ready.emit(key)
+
+
+_thumbnail_cache: ThumbnailCache | None = None
+
+
+def thumbnail_cache() -> ThumbnailCache:
+    # Shared by all games; rebuilt when another profile (media folder) is open
+    global _thumbnail_cache
+    media_dir = mw.col.media.dir()
+    if _thumbnail_cache is None or _thumbnail_cache.media_dir != media_dir:
+        if _thumbnail_cache is not None:
+            _thumbnail_cache.clear()
+        _thumbnail_cache = ThumbnailCache(media_dir)
+    return _thumbnail_cache
@@ -0,0 +1,104 @@
+from PyQt6.QtCore import QObject, QTimer, QElapsedTimer, QEasingCurve, Qt
+
+# ~60 frames per second
+FRAME_INTERVAL_MS = 16
+
+# Distance of 'fly' animation (px up)
+FLY_DISTANCE = 50
+
+
+class TileAnimator(QObject):
+    # Drives fade / shrink / fly / flash of all tiles on a page from one timer.
+    # Every frame animated values are computed from elapsed time and written to tiles,
+    # each changed tile is repainted once. Tiles paint themselves with painter opacity/scale,
+    # no QGraphicsOpacityEffect (offscreen rendering) and no animation objects per tile.
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+
+        self.clock = QElapsedTimer()
+        self.clock.start()
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(FRAME_INTERVAL_MS)
+        self.timer.timeout.connect(self._tick)
+
+        # (tile, value name) -> (start ms, duration ms, start value, end value, easing curve, on_finished)
+        self.animations = {}
+
+    def animate(self, tile, name: str, start: float, end: float, duration_ms: int,
+                easing=QEasingCurve.Type.InOutQuad, on_finished=None) -> None:
+        self.animations[(tile, name)] = (
+            self.clock.elapsed(), max(1, duration_ms), start, end, QEasingCurve(easing), on_finished
+        )
+
+        # First frame now, following frames from timer
+        tile.set_animated_value(name, start)
+        tile.update()
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def fade(self, tile, duration_ms: int) -> None:
+        self.animate(tile, "opacity", 1.0, 0.0, duration_ms)
+
+    def shrink(self, tile, duration_ms: int) -> None:
+        # Scale to the tile's center, geometry (and grid layout) doesn't change
+        self.animate(tile, "scale", 1.0, 0.0, duration_ms)
+
+    def fly(self, tile, duration_ms: int) -> None:
+        self.animate(tile, "opacity", 1.0, 0.0, duration_ms, QEasingCurve.Type.Linear)
+        self.animate(tile, "offset_y", 0.0, -FLY_DISTANCE, duration_ms, QEasingCurve.Type.Linear)
+
+    def flash(self, tile, duration_ms: int) -> None:
+        # Overlay color is set on tile, only its alpha is animated (255 -> 0)
+        self.animate(tile, "overlay_alpha", 255.0, 0.0, duration_ms, QEasingCurve.Type.OutQuad)
+
+    def is_running(self, tile, name: str) -> bool:
+        return (tile, name) in self.animations
+
+    def stop(self, tile, name: str | None = None) -> None:
+        # Stop animations of one tile (all, or only one value), values stay as they are
+        for key in [key for key in self.animations if key[0] is tile and (name is None or key[1] == name)]:
+            del self.animations[key]
+
+    def stop_all(self) -> None:
+        self.animations.clear()
+        self.timer.stop()
+
+    def _tick(self) -> None:
+        now = self.clock.elapsed()
+        changed_tiles = set()
+        finished = []
+
+        for key, (start_ms, duration_ms, start, end, curve, on_finished) in self.animations.items():
+            tile, name = key
+            progress = min(1.0, (now - start_ms) / duration_ms)
+            value = start + (end - start) * curve.valueForProgress(progress)
+            tile.set_animated_value(name, value)
+            changed_tiles.add(tile)
+            if progress >= 1.0:
+                finished.append((key, on_finished))
+
+        for key, on_finished in finished:
+            del self.animations[key]
+            if on_finished:
+                on_finished()
+
+        for tile in changed_tiles:
+            tile.update()
+
+        if not self.animations:
+            self.timer.stop()
+
+
+# Animator used by tiles not attached to any page (e.g. AnimatedButton demo window)
+_default_animator: TileAnimator | None = None
+
+
+def default_animator() -> TileAnimator:
+    global _default_animator
+    if _default_animator is None:
+        _default_animator = TileAnimator()
+    return _default_animator
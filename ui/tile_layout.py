@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from typing import NamedTuple, Sequence
+
+from PyQt6.QtCore import QRect, QSize, Qt
+from PyQt6.QtGui import QFont, QFontMetrics, QTextDocument
+
+from ..field_text import ImageField, RichText
+
+# Space around tile text: stylesheet padding (5px) + border (2px) on each side, plus extra room
+# so the text doesn't touch the border
+TILE_PADDING_X = 2 * (5 + 2) + 10
+TILE_PADDING_Y = 2 * (5 + 2)
+# Same as min-height of tile stylesheet
+TILE_MIN_HEIGHT = 40
+# Narrowest column when window is too small for its columns
+TILE_MIN_WIDTH = 60
+
+# Picture area of image tiles, thumbnails are decoded at this size
+TILE_IMAGE_SIZE = QSize(200, 140)
+
+# Measured strings kept per font size
+TEXT_SIZE_CACHE_ENTRIES = 4096
+
+
+class TextMetrics:
+    # Size of tile text wrapped at given width, for one font size.
+    # One QFontMetrics for all tiles, every string is measured once per wrap width.
+
+    def __init__(self, font_size: int):
+        self.font = QFont()
+        self.font.setPointSize(font_size)
+        self.metrics = QFontMetrics(self.font)
+        self._sizes: OrderedDict[tuple, tuple[int, int]] = OrderedDict()
+
+    def text_size(self, text: str, wrap_width: int) -> tuple[int, int]:
+        # Kind of text is part of the key: "a.jpg" image and "a.jpg" text are different tiles
+        key = (type(text), text, getattr(text, "caption", ""), wrap_width)
+        size = self._sizes.get(key)
+        if size is not None:
+            self._sizes.move_to_end(key)
+            return size
+
+        # Word wrap same like in AnimatedButton painting; width is what wrapped text really uses
+        if isinstance(text, ImageField):
+            caption_width, caption_height = self.text_size(text.caption, wrap_width) if text.caption else (0, 0)
+            size = (min(max(TILE_IMAGE_SIZE.width(), caption_width), wrap_width),
+                    TILE_IMAGE_SIZE.height() + caption_height)
+        elif isinstance(text, RichText):
+            document = QTextDocument()
+            document.setDefaultFont(self.font)
+            document.setHtml(text)
+            document.setTextWidth(wrap_width)
+            size = (min(int(document.idealWidth()) + 1, wrap_width), int(document.size().height()) + 1)
+        else:
+            bounds = self.metrics.boundingRect(QRect(0, 0, wrap_width, 0), Qt.TextFlag.TextWordWrap, text)
+            # Single word longer than a line can't wrap, it's clipped by the tile
+            size = (min(bounds.width(), wrap_width), bounds.height())
+
+        self._sizes[key] = size
+        if len(self._sizes) > TEXT_SIZE_CACHE_ENTRIES:
+            self._sizes.popitem(last=False)
+        return size
+
+
+_text_metrics: dict[int, TextMetrics] = {}
+
+
+def text_metrics(font_size: int) -> TextMetrics:
+    # Shared by all games, cached per font size
+    metrics = _text_metrics.get(font_size)
+    if metrics is None:
+        metrics = _text_metrics[font_size] = TextMetrics(font_size)
+    return metrics
+
+
+class PageLayout(NamedTuple):
+    column_width: int           # same for every column
+    row_heights: list[int]
+
+
+def max_column_width(grid_width: int, spacing: int, columns: int) -> int:
+    # Widest column that still fits all columns in the grid (window) width
+    return max(TILE_MIN_WIDTH, (grid_width - max(0, spacing) * (columns - 1)) // columns)
+
+
+def plan_page_layout(metrics: TextMetrics, slot_texts: Sequence[tuple[int, str]], columns: int,
+                     column_limit: int) -> PageLayout:
+    # Grid geometry of a page from texts of its tiles, before any tile is placed.
+    # slot_texts: (grid slot, text), slot = row * columns + column
+    # column_limit: widest allowed column, longer texts are wrapped and make their row higher
+    wrap_width = max(1, column_limit - TILE_PADDING_X)
+    column_width = 0
+    row_heights: list[int] = []
+
+    for slot, text in slot_texts:
+        width, height = metrics.text_size(text, wrap_width)
+        row = slot // columns
+        if row >= len(row_heights):
+            row_heights.extend([TILE_MIN_HEIGHT] * (row + 1 - len(row_heights)))
+        column_width = max(column_width, min(width + TILE_PADDING_X, column_limit))
+        row_heights[row] = max(row_heights[row], height + TILE_PADDING_Y)
+
+    return PageLayout(column_width, row_heights)
@@ -0,0 +1,43 @@
+from PyQt6.QtWidgets import QGridLayout, QWidget
+
+from .animated_button import AnimatedButton
+from .tile_animator import TileAnimator
+
+
+class TilePool:
+    # Reusable AnimatedButton tiles for MatchingExam pages.
+    # Tiles of finished page are taken out of the grid and hidden, next page resets and places them again,
+    # so font, stylesheet and palette are built only once per tile.
+
+    def __init__(self, parent: QWidget, animation_type='fade', animation_time=0.5, font_size=18,
+                 animator: TileAnimator | None = None):
+        self.parent = parent
+        self.animator = animator
+        self.animation_type = animation_type
+        self.animation_time = animation_time
+        self.font_size = font_size
+
+        self.free: list[AnimatedButton] = []
+        self.created = 0
+
+    def acquire(self, text) -> AnimatedButton:
+        if self.free:
+            btn = self.free.pop()
+            btn.reset(text)
+        else:
+            btn = AnimatedButton(text, self.animation_type, self.animation_time, self.font_size, self.animator)
+            btn.setParent(self.parent)
+            self.created += 1
+        return btn
+
+    def release_grid(self, grid: QGridLayout) -> None:
+        # Take all tiles out of the grid and keep them for the next page
+        while grid.count():
+            child = grid.takeAt(0)
+            widget = child.widget()
+            if isinstance(widget, AnimatedButton):
+                widget.animator.stop(widget)
+                widget.hide()
+                self.free.append(widget)
+            elif widget:
+                widget.deleteLater()